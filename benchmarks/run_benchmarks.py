@@ -0,0 +1,207 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "results")]
+
+import numpy as np
+import pandas as pd
+
+from box_scan import scan_groups
+from option_chain import best_quotes, clean_quotes, pair_legs
+from src.price_cache import CsvSource, PriceCache
+from src.volatility import VolatilityAnalyzer
+from synthetic import synthetic_chain, synthetic_prices, write_prices
+
+# ----------------------------
+# BENCHMARK SUITE
+# Times every stage of the box scan (load -> clean -> aggregate -> pivot ->
+# adjacent / all-pairs / best scan) and of the volatility analysis (rolling,
+# EWMA, event study) on seeded synthetic data at several scales, and writes
+# the timings to a json file. --compare flags stages that got slower.
+#   python benchmarks/run_benchmarks.py --scales small medium
+#   python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+# ----------------------------
+
+# chain: days x expirations x strikes (x 2 legs); prices: trading days; events: event dates
+SCALES = {
+    "small":  {"days": 5,  "expirations": 8,  "strikes": 80,  "price_days": 500,  "events": 10},
+    "medium": {"days": 20, "expirations": 16, "strikes": 160, "price_days": 2500, "events": 100},
+    "large":  {"days": 60, "expirations": 24, "strikes": 250, "price_days": 5000, "events": 1000},
+}
+
+# same settings as results/arbitrage_opp_update.py
+MIN_PROFIT = 0.25
+MAX_SPREAD_PCT = 0.25
+MAX_STRIKES_PER_EXP = 250
+R = 0.0
+
+REPEATS = 3
+SEED = 0
+OUT_DIR = os.path.join(ROOT, "benchmarks", "results")
+REGRESSION_RATIO = 1.25  # --compare: flag stages more than 25% slower
+
+
+def time_stage(fn, repeats: int):
+    """Runs fn() `repeats` times; returns (its last result, list of wall times in seconds)."""
+    times, result = [], None
+    for _ in range(repeats):
+        result = None
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return result, times
+
+
+def record(results: list, scale: str, stage: str, times: list[float], n: int):
+    results.append({
+        "scale": scale,
+        "stage": stage,
+        "n": int(n),
+        "repeats": len(times),
+        "best_s": min(times),
+        "median_s": float(np.median(times)),
+    })
+    print(f"  {stage:<16} n={n:>10,}  best {min(times):9.4f}s  median {np.median(times):9.4f}s")
+
+
+def bench_chain(scale: str, cfg: dict, tmp: str, repeats: int, results: list):
+    raw = synthetic_chain(cfg["days"], cfg["expirations"], cfg["strikes"], seed=SEED)
+    path = os.path.join(tmp, f"chain_{scale}.csv")
+    raw.to_csv(path, index=False)
+
+    df, t = time_stage(lambda: pd.read_csv(path, parse_dates=["date", "expiration"]), repeats)
+    record(results, scale, "load", t, len(df))
+    clean, t = time_stage(lambda: clean_quotes(df), repeats)
+    record(results, scale, "clean", t, len(df))
+    agg, t = time_stage(lambda: best_quotes(clean), repeats)
+    record(results, scale, "aggregate", t, len(clean))
+    legs, t = time_stage(lambda: pair_legs(agg, MAX_SPREAD_PCT), repeats)
+    record(results, scale, "pivot", t, len(agg))
+
+    T, block = legs.years_to_expiry(), legs.leg_block()
+    for mode in ("adjacent", "allpairs", "best"):
+        _, t = time_stage(lambda: scan_groups(legs.offsets, T, *block, modes=(mode,), r=R, min_profit=MIN_PROFIT,
+                                              max_strikes=MAX_STRIKES_PER_EXP), repeats)
+        record(results, scale, f"scan_{mode}", t, len(legs.strike))
+
+
+def bench_vol(scale: str, cfg: dict, tmp: str, repeats: int, results: list):
+    prices = synthetic_prices(["SPY", "^VIX"], cfg["price_days"], seed=SEED)
+    px_dir = os.path.join(tmp, f"px_{scale}")
+    write_prices(prices, px_dir)
+    index = prices["SPY"].index
+    start, end = str(index[0].date()), str((index[-1] + pd.Timedelta(days=1)).date())
+
+    def load():
+        cache = PriceCache(os.path.join(tmp, f"pc_{scale}_{time.perf_counter_ns()}"), source=CsvSource(px_dir))
+        analyzer = VolatilityAnalyzer("SPY", start, end, price_cache=cache)
+        analyzer.fetch_data()
+        return analyzer
+
+    analyzer, t = time_stage(load, repeats)
+    n = len(analyzer.data)
+    record(results, scale, "vol_load", t, n)
+    base = analyzer.data.copy()
+
+    def on_fresh(method, *args):
+        def run():
+            analyzer.data = base.copy()
+            return getattr(analyzer, method)(*args)
+        return run
+
+    _, t = time_stage(on_fresh("calculate_rolling_volatility", [20, 60, 120]), repeats)
+    record(results, scale, "vol_rolling", t, n)
+    _, t = time_stage(on_fresh("calculate_ewma_volatility", 0.94), repeats)
+    record(results, scale, "vol_ewma", t, n)
+    window = min(500, n // 2)
+    _, t = time_stage(on_fresh("calculate_garch_volatility", window), repeats)
+    record(results, scale, "vol_garch", t, n - window + 1)
+
+    rng = np.random.default_rng(SEED)
+    events = pd.DatetimeIndex(rng.choice(index.to_numpy(), cfg["events"]))
+    analyzer.data = base.copy()
+    analyzer.calculate_rolling_volatility([20])
+    _, t = time_stage(lambda: analyzer.analyze_events(events, [5, 10, 20]), repeats)
+    record(results, scale, "vol_events", t, cfg["events"])
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales: list[str], repeats: int = REPEATS) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            cfg = SCALES[scale]
+            print(f"\n=== {scale}: {cfg} ===")
+            bench_chain(scale, cfg, tmp, repeats, results)
+            bench_vol(scale, cfg, tmp, repeats, results)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": SEED,
+            "scales": {s: SCALES[s] for s in scales},
+        },
+        "results": results,
+    }
+
+
+def compare(new: dict, old: dict, ratio: float = REGRESSION_RATIO) -> list[str]:
+    """Prints best-time ratios new/old per (scale, stage); returns the regressed stages."""
+    old_best = {(r["scale"], r["stage"]): r["best_s"] for r in old["results"]}
+    print(f"\n=== vs {old['meta'].get('commit')} ({old['meta'].get('timestamp')}) ===")
+    regressed = []
+    for r in new["results"]:
+        key = (r["scale"], r["stage"])
+        if key not in old_best:
+            continue
+        change = r["best_s"] / max(old_best[key], 1e-12)
+        flag = "  <-- slower" if change > ratio else ""
+        print(f"  {key[0]:<7} {key[1]:<16} {old_best[key]:9.4f}s -> {r['best_s']:9.4f}s  x{change:5.2f}{flag}")
+        if flag:
+            regressed.append(f"{key[0]}/{key[1]}")
+    return regressed
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Time the scan and volatility pipelines on synthetic data.")
+    ap.add_argument("--scales", nargs="+", default=["small", "medium"], choices=list(SCALES))
+    ap.add_argument("--repeats", type=int, default=REPEATS)
+    ap.add_argument("--out", help="json output path (default: benchmarks/results/<timestamp>.json)")
+    ap.add_argument("--compare", help="earlier json to compare against; exits 1 on a regression")
+    args = ap.parse_args()
+
+    report = run(args.scales, args.repeats)
+    out = args.out or os.path.join(OUT_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nWrote {out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(report, json.load(f))
+        if regressed:
+            print(f"Regressions: {', '.join(regressed)}")
+            sys.exit(1)
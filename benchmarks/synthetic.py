@@ -0,0 +1,166 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# SYNTHETIC DATA (seeded, for benchmarks and offline runs)
+# SPY-like option chains in the dolt export layout (CHAIN_COLUMNS, ordered by
+# date) and daily OHLC bars in the yfinance / CsvSource layout.
+# Same arguments + seed -> same rows.
+# ----------------------------
+
+CHAIN_COLUMNS = ["date", "act_symbol", "expiration", "strike", "call_put", "bid", "ask"]
+
+
+def _norm_cdf(x: np.ndarray) -> np.ndarray:
+    # Abramowitz-Stegun 7.1.26 on erf (abs error < 1.5e-7), vectorized
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.sign(x) * erf)
+
+
+def _expiry_offsets(n: int) -> np.ndarray:
+    """Calendar days to each expiry: weeklies first, then monthlies, then quarterlies."""
+    weekly = 7 * np.arange(1, 9)
+    monthly = 30 * np.arange(3, 13)
+    quarterly = 91 * np.arange(5, 5 + max(n, 1))
+    return np.concatenate([weekly, monthly, quarterly])[:n]
+
+
+def synthetic_chain(days: int = 20, expirations: int = 8, strikes: int = 80, strike_step: float = 1.0,
+                    spread: float = 0.04, missing_legs: float = 0.03, duplicates: float = 0.02,
+                    noise: float = 0.05, spot: float = 300.0, vol: float = 0.2, r: float = 0.0,
+                    symbol: str = "SPY", start: str = "2020-01-02", seed: int = 0) -> pd.DataFrame:
+    """Option chain of days x expirations x strikes x {Call, Put} quotes.
+
+    Mids are Black-Scholes prices plus noise (in dollars) so a few boxes look
+    mispriced; spread is the typical bid/ask spread as a fraction of the mid.
+    A missing_legs fraction of quotes is dropped and a duplicates fraction is
+    re-quoted wider (the scan keeps max bid / min ask).
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=days)
+    spots = spot * np.exp(np.cumsum(rng.normal(0.0, vol / np.sqrt(252), days)))
+
+    d_idx, e_idx, k_idx = np.meshgrid(np.arange(days), np.arange(expirations), np.arange(strikes), indexing="ij")
+    d_idx, e_idx, k_idx = d_idx.ravel(), e_idx.ravel(), k_idx.ravel()
+
+    S = spots[d_idx]
+    K = np.round(S / strike_step) * strike_step + strike_step * (k_idx - strikes // 2)
+    days_out = _expiry_offsets(expirations)[e_idx]
+    T = days_out / 365.0
+    smile = vol * (1.0 + 0.5 * np.log(K / S) ** 2 / np.maximum(T, 1e-3) - 0.3 * np.log(K / S))
+    sd = smile * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * smile ** 2) * T) / sd
+    d2 = d1 - sd
+    disc = np.exp(-r * T)
+    call = S * _norm_cdf(d1) - K * disc * _norm_cdf(d2)
+    put = call - S + K * disc
+
+    n = len(S)
+    mid = np.concatenate([call, put]) + rng.normal(0.0, noise, 2 * n)
+    mid = np.maximum(mid, 0.01)
+    half = 0.5 * np.maximum(0.01, mid * spread * rng.lognormal(0.0, 0.5, 2 * n))
+    bid = np.round(np.maximum(mid - half, 0.0), 2)
+    ask = np.maximum(np.round(mid + half, 2), bid)
+
+    date = np.tile(dates.to_numpy()[d_idx], 2)
+    expiration = date + np.tile(days_out, 2).astype("timedelta64[D]")
+    strike = np.tile(K, 2)
+    call_put = np.repeat(np.array(["Call", "Put"], dtype=object), n)
+
+    keep = rng.random(2 * n) >= missing_legs
+    dup = np.flatnonzero(keep & (rng.random(2 * n) < duplicates))
+    rows = np.concatenate([np.flatnonzero(keep), dup])
+    widen = np.concatenate([np.ones(keep.sum()), np.full(len(dup), 1.01)])
+
+    df = pd.DataFrame({
+        "date": date[rows],
+        "act_symbol": symbol,
+        "expiration": expiration[rows],
+        "strike": strike[rows],
+        "call_put": call_put[rows],
+        "bid": np.round(bid[rows] / widen, 2),
+        "ask": np.round(ask[rows] * widen, 2),
+    }, columns=CHAIN_COLUMNS)
+    # dolt export order: by date (then expiration, strike)
+    return df.sort_values(["date", "expiration", "strike", "call_put"], kind="stable", ignore_index=True)
+
+
+def synthetic_prices(tickers: list[str] = ["SPY", "^VIX"], days: int = 2500, start: str = "2010-01-04",
+                     seed: int = 0) -> dict[str, pd.DataFrame]:
+    """Daily OHLC bars per ticker (Date index, Open/High/Low/Close/Adj Close/Volume).
+
+    Equities follow a GBM whose volatility clusters (GARCH-like); '^VIX' is a
+    mean-reverting level around 20 that rises with the equity volatility.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(start, periods=days, name="Date")
+
+    # shared volatility regime, so the VIX tracks realized vol
+    var = np.empty(days)
+    var[0] = 0.18 ** 2 / 252
+    shocks = rng.standard_normal(days)
+    for t in range(1, days):
+        var[t] = 0.02 * 0.18 ** 2 / 252 + 0.08 * var[t - 1] * shocks[t - 1] ** 2 + 0.90 * var[t - 1]
+    ann_vol = np.sqrt(var * 252)
+
+    out = {}
+    for i, ticker in enumerate(tickers):
+        if ticker == "^VIX":
+            close = np.maximum(9.0, 100 * ann_vol * 1.15 + rng.normal(0.0, 0.8, days))
+        else:
+            beta = 1.0 + 0.25 * i
+            eps = 0.7 * shocks + np.sqrt(1 - 0.7 ** 2) * rng.standard_normal(days)
+            rets = 0.07 / 252 + beta * np.sqrt(var) * eps
+            close = 100.0 * (1 + i) * np.exp(np.cumsum(rets))
+        wiggle = np.abs(rng.normal(0.0, 0.004, (2, days)))
+        open_ = close * np.exp(rng.normal(0.0, 0.003, days))
+        out[ticker] = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) * (1 + wiggle[0]),
+            "Low": np.minimum(open_, close) * (1 - wiggle[1]),
+            "Close": close,
+            "Adj Close": close,
+            "Volume": rng.integers(10_000_000, 100_000_000, days),
+        }, index=index)
+    return out
+
+
+def write_prices(prices: dict[str, pd.DataFrame], directory: str):
+    """Writes <directory>/<ticker>.csv files readable by price_cache.CsvSource."""
+    os.makedirs(directory, exist_ok=True)
+    for ticker, df in prices.items():
+        df.to_csv(os.path.join(directory, f"{ticker}.csv"))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Write a seeded synthetic option chain or price series.")
+    sub = ap.add_subparsers(dest="what", required=True)
+    ch = sub.add_parser("chain", help="option chain csv (dolt export layout)")
+    ch.add_argument("out")
+    ch.add_argument("--days", type=int, default=20)
+    ch.add_argument("--expirations", type=int, default=8)
+    ch.add_argument("--strikes", type=int, default=80)
+    ch.add_argument("--spread", type=float, default=0.04)
+    ch.add_argument("--missing-legs", type=float, default=0.03)
+    ch.add_argument("--seed", type=int, default=0)
+    px = sub.add_parser("prices", help="<dir>/<ticker>.csv daily bars")
+    px.add_argument("out_dir")
+    px.add_argument("--tickers", nargs="+", default=["SPY", "^VIX"])
+    px.add_argument("--days", type=int, default=2500)
+    px.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.what == "chain":
+        df = synthetic_chain(args.days, args.expirations, args.strikes, spread=args.spread,
+                             missing_legs=args.missing_legs, seed=args.seed)
+        df.to_csv(args.out, index=False)
+        print(f"Wrote {len(df):,} quotes to {args.out}")
+    else:
+        write_prices(synthetic_prices(args.tickers, args.days, seed=args.seed), args.out_dir)
+        print(f"Wrote {len(args.tickers)} price series to {args.out_dir}")
@@ -1,24 +1,36 @@
+import os
+
+import pandas as pd
+
+from src.price_cache import PriceCache
 from src.volatility import VolatilityAnalyzer
 
+ATM_IV_PATH = 'spy_atm_iv.parquet'
+
 def main():
     # 1. Setup
     ticker = 'SPY'
     print(f"--- Starting Analysis for {ticker} ---")
-    analyzer = VolatilityAnalyzer(ticker, start_date='2019-02-09', end_date='2025-12-23')
+    # prices are cached under ./data/prices; offline=True never touches the network
+    cache = PriceCache('./data/prices', offline=False)
+    analyzer = VolatilityAnalyzer(ticker, start_date='2019-02-09', end_date='2025-12-23', price_cache=cache)
 
     # 2. Fetch & Compute
     analyzer.fetch_data()
     analyzer.calculate_rolling_volatility(windows=[20, 60, 120])
     analyzer.calculate_ewma_volatility(decay_factor=0.94)
+    # daily-refit GARCH(1,1) on 2y windows; fits are cached so later runs only refit new days
+    analyzer.calculate_garch_volatility(window=500, workers=None, cache_dir='./data/garch')
 
     # 3. Event Analysis (Example: SVB Crisis March 2023)
     impact = analyzer.analyze_event_impact('2023-03-10', lookback_window=15)
     print("\n--- Event Impact Analysis ---")
     print(impact)
 
-    # 4. Visualize
+    # 4. Visualize (with the option chain's ATM implied vols if results/implied_vol.py has been run)
+    iv_term = pd.read_parquet(ATM_IV_PATH) if os.path.exists(ATM_IV_PATH) else None
     print("\nPlotting results...")
-    analyzer.plot_comparison()
+    analyzer.plot_comparison(iv_term)
 
 if __name__ == "__main__":
     main()
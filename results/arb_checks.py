@@ -0,0 +1,140 @@
+import numpy as np
+
+from box_scan import TOP_K, box_pairs
+
+# ----------------------------
+# STATIC NO-ARBITRAGE CHECKS
+# Run on the same strike-sorted call/put leg arrays as the box scan (one
+# (date, symbol, expiration) group at a time, see option_chain.LegGroups),
+# each check a handful of O(n) array operations, all of them in one pass
+# over the groups. Buys at the ask, sells at the bid; profit is per share.
+#   box        K1 < K2 box spreads (box_scan.box_pairs, BOX_MODE)
+#   parity     synthetic forward K + (C - P) / disc at each strike vs the
+#              expiry's median mid forward (no underlying quote in the chain,
+#              so this flags outliers rather than a locked-in trade)
+#   vertical   calls non-increasing / puts non-decreasing in K, and slopes
+#              bounded by the discounted strike gap; for each upper strike j
+#              the best lower strike i < j is reported (running min / max)
+#   butterfly  convexity of calls and puts over adjacent strike triples
+#              (uneven spacing weighted), long fly costing < 0
+# ----------------------------
+
+CHECKS = ("box", "parity", "vertical", "butterfly")
+BOX_MODE = "best"
+
+CHECK_FIELDS = {
+    "box": ["K1", "K2", "payoff_pv", "cost_buy", "profit_buy", "proceeds_sell", "profit_sell"],
+    "parity": ["K", "fwd_bid", "fwd_ask", "fwd_ref", "side", "profit"],
+    "vertical": ["K1", "K2", "side", "bound", "profit"],
+    "butterfly": ["K1", "K2", "K3", "side", "cost", "profit"],
+}
+
+
+def _prefix_best(x: np.ndarray, op) -> tuple[np.ndarray, np.ndarray]:
+    """For j = 1..n-1: op (np.minimum / np.maximum) of x[:j] and the index attaining it."""
+    acc = op.accumulate(x)
+    idx = np.maximum.accumulate(np.where(x == acc, np.arange(len(x)), 0))
+    return acc[:-1], idx[:-1]
+
+
+def _box(K, cb, ca, pb, pa, disc, min_profit, box_mode=BOX_MODE, top_k=TOP_K):
+    pairs = box_pairs(K, cb, ca, pb, pa, disc=disc, mode=box_mode, min_profit=min_profit, top_k=top_k)
+    return {f: pairs[f] for f in CHECK_FIELDS["box"]}
+
+
+def _parity(K, cb, ca, pb, pa, disc, min_profit, **_):
+    fwd_bid = K + (cb - pa) / disc   # sell the synthetic forward (sell call, buy put)
+    fwd_ask = K + (ca - pb) / disc   # buy it
+    ref = np.median(K + ((cb + ca) - (pb + pa)) / 2 / disc)
+    rich = (fwd_bid - ref) * disc
+    cheap = (ref - fwd_ask) * disc
+    profit = np.maximum(rich, cheap)
+    keep = profit >= min_profit if min_profit is not None else np.ones(len(K), dtype=bool)
+    return {
+        "K": K[keep],
+        "fwd_bid": fwd_bid[keep],
+        "fwd_ask": fwd_ask[keep],
+        "fwd_ref": np.full(keep.sum(), ref),
+        "side": np.where(rich >= cheap, "sell", "buy")[keep].astype(object),
+        "profit": profit[keep],
+    }
+
+
+def _vertical(K, cb, ca, pb, pa, disc, min_profit, **_):
+    Kd = K * disc
+    j = np.arange(1, len(K))
+    parts = []
+    # (side, bound, profit_j = gain[j] - best over i < j of loss[i])
+    for side, bound, gain, loss in (
+        ("call", "monotonic", cb, ca),            # buy C(K1) ask, sell C(K2) bid: C2_bid > C1_ask
+        ("call", "slope", -(ca + Kd), -(cb + Kd)),  # sell C(K1), buy C(K2): C1 - C2 > (K2 - K1) d
+        ("put", "monotonic", -pa, -pb),           # sell P(K1) bid, buy P(K2) ask: P1_bid > P2_ask
+        ("put", "slope", pb - Kd, pa - Kd),       # sell P(K2), buy P(K1): P2 - P1 > (K2 - K1) d
+    ):
+        best_loss, i = _prefix_best(loss, np.minimum)
+        profit = gain[1:] - best_loss
+        keep = profit >= min_profit if min_profit is not None else np.ones(len(profit), dtype=bool)
+        n = keep.sum()
+        parts.append([K[i[keep]], K[j[keep]], np.full(n, side, dtype=object), np.full(n, bound, dtype=object),
+                      profit[keep]])
+    return {f: np.concatenate([p[k] for p in parts]) for k, f in enumerate(CHECK_FIELDS["vertical"])}
+
+
+def _butterfly(K, cb, ca, pb, pa, disc, min_profit, **_):
+    K1, K2, K3 = K[:-2], K[1:-1], K[2:]
+    w1 = (K3 - K2) / (K3 - K1)
+    w3 = (K2 - K1) / (K3 - K1)
+    parts = []
+    for side, bid, ask in (("call", cb, ca), ("put", pb, pa)):
+        cost = w1 * ask[:-2] + w3 * ask[2:] - bid[1:-1]  # long fly, payoff >= 0
+        keep = -cost >= min_profit if min_profit is not None else np.ones(len(cost), dtype=bool)
+        parts.append([K1[keep], K2[keep], K3[keep], np.full(keep.sum(), side, dtype=object),
+                      cost[keep], -cost[keep]])
+    return {f: np.concatenate([p[k] for p in parts]) for k, f in enumerate(CHECK_FIELDS["butterfly"])}
+
+
+CHECK_FUNCS = {"box": _box, "parity": _parity, "vertical": _vertical, "butterfly": _butterfly}
+MIN_STRIKES = {"box": 2, "parity": 1, "vertical": 2, "butterfly": 3}
+
+
+def _empty(check: str) -> dict:
+    out = {f: np.empty(0, dtype=object if f in ("side", "bound") else np.float64) for f in CHECK_FIELDS[check]}
+    out["group"] = np.empty(0, dtype=np.intp)
+    out["T_years"] = np.empty(0, dtype=np.float64)
+    return out
+
+
+def check_groups(offsets, T, strike, call_bid, call_ask, put_bid, put_ask,
+                 checks=CHECKS, r: float = 0.0, min_profit: float | None = None,
+                 box_mode: str = BOX_MODE, top_k: int = TOP_K) -> dict:
+    """Runs every requested check on every group of a packed leg block in one pass.
+
+    Same inputs as box_scan.scan_groups. min_profit=None keeps every evaluated
+    row, otherwise only rows with profit >= min_profit. Returns {check: fields}
+    with CHECK_FIELDS[check] plus "group" and "T_years".
+    """
+    unknown = set(checks) - set(CHECKS)
+    if unknown:
+        raise ValueError(f"Unknown check(s): {sorted(unknown)}")
+    parts = {c: [] for c in checks}
+
+    for g in range(len(offsets) - 1):
+        rows = slice(offsets[g], offsets[g + 1])
+        n = offsets[g + 1] - offsets[g]
+        disc = np.exp(-r * T[g])
+        legs = (np.asarray(strike[rows], dtype=np.float64), call_bid[rows], call_ask[rows],
+                put_bid[rows], put_ask[rows])
+        for c in checks:
+            if n < MIN_STRIKES[c]:
+                continue
+            res = CHECK_FUNCS[c](*legs, disc, min_profit, box_mode=box_mode, top_k=top_k)
+            m = len(res[CHECK_FIELDS[c][0]])
+            if m:
+                res["group"] = np.full(m, g, dtype=np.intp)
+                res["T_years"] = np.full(m, T[g])
+                parts[c].append(res)
+
+    return {
+        c: {f: np.concatenate([p[f] for p in chunks]) for f in chunks[0]} if chunks else _empty(c)
+        for c, chunks in parts.items()
+    }
@@ -1,5 +1,7 @@
 import pandas as pd
 
+from box_scan import box_pairs
+
 df = pd.read_csv("./options/spy_option_chain.csv", parse_dates=["date", "expiration"])
 df["strike"] = df["strike"].astype(float)
 
@@ -21,33 +23,18 @@ p = p.reset_index()
 
 # print(p.head())
 # scan each (date,sym,exp) across strike pairs
-out = []
+parts = []
 for (d,sym,exp), g in p.groupby(["date","act_symbol","expiration"]):
     g = g.sort_values("strike")
-    strikes = g["strike"].to_list()
-    g = g.set_index("strike")
-
-    for i in range(len(strikes)-1):
-        K1, K2 = strikes[i], strikes[i+1]   # start with adjacent strikes (simple)
-        C1a = g.loc[K1, "Call_ask"]; C2b = g.loc[K2, "Call_bid"]
-        P2a = g.loc[K2, "Put_ask"];  P1b = g.loc[K1, "Put_bid"]
-
-        cost_buy = C1a - C2b + P2a - P1b
-        payoff = K2 - K1
-        profit_buy = payoff - cost_buy
-
-        C1b = g.loc[K1, "Call_bid"]; C2a = g.loc[K2, "Call_ask"]
-        P2b = g.loc[K2, "Put_bid"];  P1a = g.loc[K1, "Put_ask"]
-
-        proceeds_sell = C1b - C2a + P2b - P1a
-        profit_sell = proceeds_sell - payoff
 
-        out.append([d,sym,exp,K1,K2,cost_buy,profit_buy,proceeds_sell,profit_sell])
+    # start with adjacent strikes (simple)
+    pairs = box_pairs(g["strike"], g["Call_bid"], g["Call_ask"], g["Put_bid"], g["Put_ask"],
+                      mode="adjacent")
+    part = pd.DataFrame({k: pairs[k] for k in ["K1","K2","cost_buy","profit_buy","proceeds_sell","profit_sell"]})
+    part.insert(0, "date", d); part.insert(1, "act_symbol", sym); part.insert(2, "expiration", exp)
+    parts.append(part)
 
-res = pd.DataFrame(out, columns=[
-    "date","act_symbol","expiration","K1","K2",
-    "cost_buy","profit_buy","proceeds_sell","profit_sell"
-])
+res = pd.concat(parts, ignore_index=True)
 
 res.to_csv("spy_arbitrage_opportunities.csv", index=False)
 # # show best candidates
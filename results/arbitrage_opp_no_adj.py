@@ -1,5 +1,7 @@
 import pandas as pd
 
+from box_scan import box_pairs
+
 # 1) load raw option chain
 df = pd.read_csv("./options/spy_option_chain.csv", parse_dates=["date","expiration"])
 df["strike"] = df["strike"].astype(float)
@@ -19,37 +21,19 @@ p.columns = [f"{cp}_{ba}" for ba, cp in p.columns]  # -> Call_bid, Call_ask, Put
 p = p.reset_index()
 
 # 3) scan ALL strike pairs K1 < K2 per (date,symbol,expiration)
-out = []
+parts = []
 for (d,sym,exp), g in p.groupby(["date","act_symbol","expiration"]):
-    g = g.sort_values("strike").set_index("strike")
-    strikes = g.index.to_list()
-    if len(strikes) < 2:
+    g = g.sort_values("strike")
+    if len(g) < 2:
         continue
 
-    for i in range(len(strikes)):
-        K1 = strikes[i]
-        C1a, C1b = g.loc[K1, "Call_ask"], g.loc[K1, "Call_bid"]
-        P1a, P1b = g.loc[K1, "Put_ask"],  g.loc[K1, "Put_bid"]
-
-        for j in range(i+1, len(strikes)):
-            K2 = strikes[j]
-            C2a, C2b = g.loc[K2, "Call_ask"], g.loc[K2, "Call_bid"]
-            P2a, P2b = g.loc[K2, "Put_ask"],  g.loc[K2, "Put_bid"]
-
-            payoff = K2 - K1
-
-            cost_buy = C1a - C2b + P2a - P1b
-            profit_buy = payoff - cost_buy
-
-            proceeds_sell = C1b - C2a + P2b - P1a
-            profit_sell = proceeds_sell - payoff
-
-            out.append([d,sym,exp,K1,K2,cost_buy,profit_buy,proceeds_sell,profit_sell])
+    pairs = box_pairs(g["strike"], g["Call_bid"], g["Call_ask"], g["Put_bid"], g["Put_ask"],
+                      mode="allpairs")
+    part = pd.DataFrame({k: pairs[k] for k in ["K1","K2","cost_buy","profit_buy","proceeds_sell","profit_sell"]})
+    part.insert(0, "date", d); part.insert(1, "act_symbol", sym); part.insert(2, "expiration", exp)
+    parts.append(part)
 
-res = pd.DataFrame(out, columns=[
-    "date","act_symbol","expiration","K1","K2",
-    "cost_buy","profit_buy","proceeds_sell","profit_sell"
-])
+res = pd.concat(parts, ignore_index=True)
 
 # 4) show top results
 print("TOP BUY-BOX:")
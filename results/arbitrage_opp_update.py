@@ -1,12 +1,44 @@
+import os
+from collections import deque
+from dataclasses import asdict
+
 import numpy as np
 import pandas as pd
 
+from arb_checks import CHECK_FIELDS
+from box_episodes import EpisodeTracker, episodes_from_csv, manifest_partitions, write_episodes
+from chain_cache import iter_cached_slices
+from chain_store import ChainFilter, iter_store_slices
+from daily_summary import update_summaries
+from low_memory import MEMORY_BUDGET_MB, ChunkPlan, StreamingOutput, plan_chunks
+from option_chain import (CHUNK_ROWS, LegGroups, best_quotes, clean_quotes, compact_quotes, concat_quotes,
+                          iter_chain_slices, pair_legs)
+from parallel_scan import scan_batches
+from pipeline_stats import NULL_PROFILER, StageProfiler
+from scan_manifest import ScanManifest, partition_key
+
 # ----------------------------
 # CONFIG
 # ----------------------------
 PATH = "./options/spy_option_chain.csv"  # same path style you used
 OUT_ALL = "spy_box_arbitrage_allpairs.csv"
 OUT_ADJ = "spy_box_arbitrage_adjacent.csv"
+OUT_BEST = "spy_box_arbitrage_best.csv"
+OUTPUTS = {"allpairs": OUT_ALL, "adjacent": OUT_ADJ, "best": OUT_BEST}  # mode -> csv, filled in one scan
+MANIFEST = "spy_box_arbitrage.manifest.json"  # incremental mode bookkeeping
+
+# extra static no-arbitrage checks (arb_checks.py) evaluated in the same pass over the
+# same legs, one csv per check, e.g. CHECKS = ("parity", "vertical", "butterfly")
+CHECKS = ()
+CHECK_BOX_MODE = "best"  # box_scan mode of the "box" check (TOP_K applies to "best")
+CHECK_OUTPUTS = {c: f"spy_static_arb_{c}.csv" for c in ("box", "parity", "vertical", "butterfly")}
+# track how long each box stays a candidate across scan dates (box_episodes.py) for these
+# modes, written as <output>.episodes.parquet, e.g. EPISODES = ("allpairs",)
+EPISODES = ()
+EPISODE_MAX_GAP = 0  # scanned days a box may drop out without ending its episode
+USE_CACHE = True  # read the cleaned per-date cache (chain_cache.py), rebuilt when the csv changes
+STORE = None      # or a SQLite store built by chain_store.py (e.g. "./options/spy_chain.sqlite"),
+                  # read instead of the csv with CHAIN_FILTER pushed down into the query
 
 # arbitrage thresholds (in option price units, e.g. dollars per share)
 MIN_PROFIT = 0.25      # ignore tiny "profits" that are likely noise/fees
@@ -17,145 +49,342 @@ R = 0.00               # risk-free rate for discounting (keep 0 if you don't wan
 COVID_START = "2020-02-15"
 COVID_END   = "2020-04-30"
 
+# which part of the chain to scan (chain_store.ChainFilter: trade dates, expirations, DTE,
+# strike/forward moneyness), e.g. ChainFilter(start=COVID_START, end=COVID_END, max_dte=90)
+CHAIN_FILTER = ChainFilter()
+
 # safety to avoid O(n^2) blow-ups on huge chains
 MAX_STRIKES_PER_EXP = 250   # if more, keep the most liquid/tight-spread strikes only
+                            # (not applied in "best" mode, which is linear in the strikes)
+TOP_K = 5                   # best buy + best sell boxes kept per expiry in "best" mode
+
+# parallel scan (parallel_scan.py): 1 = in-process, None = all cores
+WORKERS = 1
+BATCH_ROWS = 200_000        # max strikes per batch shipped to a worker (a batch never spans two days)
+
+# low-memory mode (low_memory.py): slices kept as categorical / int32-cents / float32 frames,
+# csv chunks, scan batches and batches in flight sized from low_memory.MEMORY_BUDGET_MB, and every
+# output streamed to disk batch by batch; the outputs are the same, run() then returns only the rows
+# the report prints
+LOW_MEMORY = False
+
+# incremental mode (scan_manifest.py): only scan (date, act_symbol) partitions that are new
+# or whose quotes changed since the last run and append them to the outputs; a change to the
+# config above forces a full rebuild
+INCREMENTAL = False
+
+# per-stage timing / rows / memory report (pipeline_stats.py), written next to the outputs;
+# tracemalloc slows the run down noticeably, PROFILE_MEMORY = False keeps only time + peak RSS
+PROFILE = False
+PROFILE_OUT = "spy_box_arbitrage.profile.json"
+PROFILE_MEMORY = True
 
 # ----------------------------
-# LOAD + CLEAN
+# LOAD + CLEAN (one trading day at a time, see option_chain.py / chain_cache.py)
+# calls and puts are paired per strike by a sort-merge join (option_chain.pair_legs)
+# the quotes held at once are bounded by one trading day (iter_batches); the candidate rows
+# of every output are kept until the end of the run, unless LOW_MEMORY streams them to disk
 # ----------------------------
-df = pd.read_csv(PATH, parse_dates=["date", "expiration"])
-df["strike"] = pd.to_numeric(df["strike"], errors="coerce")
-df["bid"] = pd.to_numeric(df["bid"], errors="coerce")
-df["ask"] = pd.to_numeric(df["ask"], errors="coerce")
-
-df = df[["date", "act_symbol", "expiration", "strike", "call_put", "bid", "ask"]].dropna()
-
-# basic quote sanity
-df = df[(df["bid"] >= 0) & (df["ask"] >= df["bid"])]
-
-# conservative aggregation for duplicate quotes:
-# - best executable bid = max bid
-# - best executable ask = min ask
-agg = (
-    df.groupby(["date", "act_symbol", "expiration", "strike", "call_put"], as_index=False)
-      .agg(bid=("bid", "max"), ask=("ask", "min"))
-)
-
-# pivot to get Call_bid/ask and Put_bid/ask on one row
-p = agg.pivot_table(
-    index=["date", "act_symbol", "expiration", "strike"],
-    columns="call_put",
-    values=["bid", "ask"],
-    aggfunc="first"
-).dropna()
-
-p.columns = [f"{cp}_{ba}" for ba, cp in p.columns]  # Call_bid, Call_ask, Put_bid, Put_ask
-p = p.reset_index()
-
-# spread filter to kill most fake "arb"
-p["Call_spread_pct"] = (p["Call_ask"] - p["Call_bid"]) / np.maximum(p["Call_ask"], 1e-9)
-p["Put_spread_pct"]  = (p["Put_ask"]  - p["Put_bid"])  / np.maximum(p["Put_ask"],  1e-9)
-
-p = p[
-    (p["Call_bid"] > 0) & (p["Put_bid"] > 0) &
-    (p["Call_spread_pct"] <= MAX_SPREAD_PCT) &
-    (p["Put_spread_pct"]  <= MAX_SPREAD_PCT)
-].copy()
+def load_slices(path: str = PATH, manifest: ScanManifest | None = None, profiler=NULL_PROFILER,
+                chunksize: int = CHUNK_ROWS):
+    """Yields the cleaned best-bid/min-ask quotes for each (date, act_symbol).
+
+    With a manifest, slices it already holds unchanged are skipped.
+    """
+    if STORE is not None:
+        aggs = profiler.iterate("load_store", iter_store_slices(STORE, CHAIN_FILTER), rows_out=lambda s: len(s[2]))
+    else:
+        if USE_CACHE:
+            aggs = profiler.iterate("load_cache", iter_cached_slices(path, CHAIN_FILTER.start, CHAIN_FILTER.end),
+                                    rows_out=lambda s: len(s[2]))
+        else:
+            aggs = _clean_slices(profiler.iterate("read_csv", iter_chain_slices(path, chunksize),
+                                                  rows_out=lambda s: len(s[2])), profiler)
+        if not CHAIN_FILTER.is_empty():
+            aggs = ((d, sym, CHAIN_FILTER.apply(agg)) for d, sym, agg in aggs)
+
+    for d, sym, agg in aggs:
+        if manifest is not None and not manifest.needs_scan(d, sym, agg):
+            profiler.count("partitions_unchanged")
+            continue
+        if not agg.empty:
+            yield agg
+
+
+def _clean_slices(slices, profiler):
+    for d, sym, raw in slices:
+        with profiler.stage("clean", rows_in=len(raw)) as st:
+            clean = clean_quotes(raw)
+            st.rows_out = len(clean)
+        with profiler.stage("aggregate", rows_in=len(clean)) as st:
+            agg = best_quotes(clean)
+            st.rows_out = len(agg)
+        del clean
+        yield d, sym, agg
+
 
 # ----------------------------
-# BOX-SPREAD SCAN (adjacent + all-pairs)
+# BOX-SPREAD SCAN (adjacent + all-pairs + best, vectorized in box_scan.py,
+# optionally on a process pool via parallel_scan.py)
 # Long box cost:  +C(K1) -C(K2) -P(K1) +P(K2)
 # Use ask for buys, bid for sells.
 # cost_buy        = C1_ask - C2_bid + P2_ask - P1_bid
 # Short box proceeds is the opposite using bid/ask.
 # ----------------------------
-def scan_boxes(group: pd.DataFrame, mode: str):
-    g = group.sort_values("strike").set_index("strike")
-    strikes = g.index.to_numpy()
-
-    # downselect if too many strikes
-    if len(strikes) > MAX_STRIKES_PER_EXP:
-        tmp = group.copy()
-        tmp["spread_score"] = tmp["Call_spread_pct"] + tmp["Put_spread_pct"]
-        tmp = tmp.sort_values(["spread_score"]).head(MAX_STRIKES_PER_EXP)
-        g = tmp.sort_values("strike").set_index("strike")
-        strikes = g.index.to_numpy()
-
-    if len(strikes) < 2:
-        return []
-
-    # time to expiry discount
-    d = group["date"].iloc[0]
-    exp = group["expiration"].iloc[0]
-    T = max((exp - d).days / 365.0, 0.0)
-    disc = np.exp(-R * T)
-
-    out = []
-
-    if mode == "adjacent":
-        for i in range(len(strikes) - 1):
-            K1, K2 = float(strikes[i]), float(strikes[i + 1])
-
-            C1a, C1b = float(g.loc[K1, "Call_ask"]), float(g.loc[K1, "Call_bid"])
-            P1a, P1b = float(g.loc[K1, "Put_ask"]),  float(g.loc[K1, "Put_bid"])
-            C2a, C2b = float(g.loc[K2, "Call_ask"]), float(g.loc[K2, "Call_bid"])
-            P2a, P2b = float(g.loc[K2, "Put_ask"]),  float(g.loc[K2, "Put_bid"])
-
-            payoff_pv = (K2 - K1) * disc
-
-            cost_buy = C1a - C2b + P2a - P1b
-            profit_buy = payoff_pv - cost_buy
-
-            proceeds_sell = C1b - C2a + P2b - P1a
-            profit_sell = proceeds_sell - payoff_pv
-
-            if (profit_buy >= MIN_PROFIT) or (profit_sell >= MIN_PROFIT):
-                out.append([d, group["act_symbol"].iloc[0], exp, K1, K2, payoff_pv,
-                            cost_buy, profit_buy, proceeds_sell, profit_sell, T])
-
-        return out
-
-    # all pairs (O(n^2))
-    for i in range(len(strikes) - 1):
-        K1 = float(strikes[i])
-        C1a, C1b = float(g.loc[K1, "Call_ask"]), float(g.loc[K1, "Call_bid"])
-        P1a, P1b = float(g.loc[K1, "Put_ask"]),  float(g.loc[K1, "Put_bid"])
-
-        for j in range(i + 1, len(strikes)):
-            K2 = float(strikes[j])
-            C2a, C2b = float(g.loc[K2, "Call_ask"]), float(g.loc[K2, "Call_bid"])
-            P2a, P2b = float(g.loc[K2, "Put_ask"]),  float(g.loc[K2, "Put_bid"])
-
-            payoff_pv = (K2 - K1) * disc
-
-            cost_buy = C1a - C2b + P2a - P1b
-            profit_buy = payoff_pv - cost_buy
-
-            proceeds_sell = C1b - C2a + P2b - P1a
-            profit_sell = proceeds_sell - payoff_pv
-
-            if (profit_buy >= MIN_PROFIT) or (profit_sell >= MIN_PROFIT):
-                out.append([d, group["act_symbol"].iloc[0], exp, K1, K2, payoff_pv,
-                            cost_buy, profit_buy, proceeds_sell, profit_sell, T])
-
-    return out
-
-
-def run(mode: str, out_path: str):
-    rows = []
-    for _, grp in p.groupby(["date", "act_symbol", "expiration"], sort=False):
-        rows.extend(scan_boxes(grp, mode=mode))
+BOX_COLUMNS = [
+    "date","act_symbol","expiration","K1","K2","payoff_pv",
+    "cost_buy","profit_buy","proceeds_sell","profit_sell","T_years"
+]
+
+
+def iter_batches(batch_rows: int = BATCH_ROWS, manifest: ScanManifest | None = None, profiler=NULL_PROFILER,
+                 compact: bool = False, chunksize: int = CHUNK_ROWS, keys: deque | None = None):
+    """Pairs call/put legs of the per-day slices into LegGroups batches, one trading day each.
+
+    A day's slices (one per act_symbol) are flushed as soon as the next day starts, so
+    the pending quotes never span two days; a day with more than batch_rows strikes is
+    split further, between symbols. compact keeps the pending slices as option_chain.compact_quotes frames. keys, if
+    given, gets the (date, act_symbol) of every slice of a batch (including slices
+    that produce no legs) appended as one list just before the batch is yielded.
+    """
+    def paired(frames):
+        # pivot to call/put legs per strike + spread filter
+        with profiler.stage("pair_legs") as st:
+            agg = concat_quotes(frames)
+            frames.clear()  # the slices are in agg now
+            legs = pair_legs(agg, MAX_SPREAD_PCT)
+            st.rows_in, st.rows_out = len(agg), len(legs.strike)
+        return legs
+
+    def flush():
+        legs = paired(frames)
+        if keys is not None:
+            keys.append(parts.copy())
+        parts.clear()
+        return legs
+
+    frames, parts, n = [], [], 0
+    for agg in load_slices(manifest=manifest, profiler=profiler, chunksize=chunksize):
+        d = agg["date"].iat[0]
+        if parts and d != parts[-1][0]:
+            n = 0
+            yield flush()
+        n += len(agg) // 2  # one call + one put quote per strike
+        parts.append((d, agg["act_symbol"].iat[0]))
+        frames.append(compact_quotes(agg) if compact else agg)
+        del agg
+        if n >= batch_rows:
+            n = 0
+            yield flush()
+    if frames:
+        yield flush()
+
+
+def check_columns(check: str) -> list[str]:
+    return ["date", "act_symbol", "expiration", *CHECK_FIELDS[check], "T_years"]
+
+
+def pairs_to_frame(legs: LegGroups, pairs: dict, columns: list[str] = BOX_COLUMNS) -> pd.DataFrame:
+    g = pairs["group"]
+    out = {
+        "date": legs.date[g],
+        "act_symbol": legs.act_symbol[g],
+        "expiration": legs.expiration[g],
+    }
+    out.update({k: pairs[k] for k in columns[3:]})
+    return pd.DataFrame(out, columns=columns)
+
+
+def scan_config(outputs: dict) -> dict:
+    cfg = {"outputs": outputs, "MIN_PROFIT": MIN_PROFIT, "MAX_SPREAD_PCT": MAX_SPREAD_PCT, "R": R,
+           "MAX_STRIKES_PER_EXP": MAX_STRIKES_PER_EXP, "TOP_K": TOP_K}
+    if "box" in outputs:
+        cfg["CHECK_BOX_MODE"] = CHECK_BOX_MODE
+    if not CHAIN_FILTER.is_empty():
+        cfg["CHAIN_FILTER"] = asdict(CHAIN_FILTER)
+    return cfg
+
+
+def scan(modes, manifest: ScanManifest | None = None, profiler=NULL_PROFILER, checks=(),
+         trackers: dict[str, EpisodeTracker] | None = None, sinks: dict[str, StreamingOutput] | None = None,
+         plan: ChunkPlan | None = None) -> dict[str, pd.DataFrame]:
+    """One pass over the chain filling every requested mode's candidate table and check's result table.
+
+    trackers: mode -> EpisodeTracker fed with that mode's candidates as the scan moves through the dates.
+    sinks: name -> StreamingOutput taking each batch's rows instead of keeping them (low-memory
+    mode, with the chunk sizes of plan); the returned tables are then their report rows.
+    """
+    trackers = trackers or {}
+    columns = {**{mode: BOX_COLUMNS for mode in modes}, **{c: check_columns(c) for c in checks}}
+    parts = {name: [] for name in columns}
+    keys = deque()  # scanned (date, act_symbol) slices of each batch, in scan order
+    if plan is not None:
+        batches = iter_batches(plan.batch_rows, manifest, profiler, compact=True, chunksize=plan.csv_chunk_rows,
+                               keys=keys)
+    else:
+        batches = iter_batches(manifest=manifest, profiler=profiler, keys=keys)
+    scanned = scan_batches(
+        batches, workers=WORKERS, max_in_flight=plan.max_in_flight if plan is not None else None,
+        checks=tuple(checks), box_mode=CHECK_BOX_MODE,
+        modes=tuple(modes), r=R, min_profit=MIN_PROFIT, max_strikes=MAX_STRIKES_PER_EXP,
+        top_k=TOP_K,
+    )
+    scanned = profiler.iterate("scan", scanned, rows_in=lambda lp: len(lp[0].strike),
+                               rows_out=lambda lp: sum(len(p["group"]) for p in lp[1].values()))
+    downselects = MAX_STRIKES_PER_EXP is not None and any(m != "best" for m in modes)
+    for legs, pairs in scanned:
+        partitions = keys.popleft()
+        if profiler.enabled:
+            sizes = np.diff(legs.offsets)
+            profiler.count("groups", len(sizes))
+            if downselects:
+                over = sizes[sizes > MAX_STRIKES_PER_EXP]
+                profiler.count("groups_downselected", len(over))
+                profiler.count("strikes_downselected_away", (over - MAX_STRIKES_PER_EXP).sum())
+        with profiler.stage("to_frame") as st:
+            for name, cols in columns.items():
+                part = pairs_to_frame(legs, pairs[name], cols)
+                if sinks is not None:
+                    sinks[name].add(part)
+                elif not part.empty:
+                    parts[name].append(part)
+                if name in trackers:
+                    trackers[name].feed(part, partitions)
+            st.rows_out = sum(len(pairs[name]["group"]) for name in columns)
+
+    if sinks is not None:
+        return {name: sink.report_frame() for name, sink in sinks.items()}
+    return {
+        name: pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns[name])
+        for name, frames in parts.items()
+    }
+
+
+def write_incremental(res: pd.DataFrame, manifest: ScanManifest, out_path: str):
+    """Appends the newly scanned partitions to out_path, or rewrites it if older ones changed.
+
+    A rebuild always replaces out_path, with just the header when there are no rows.
+    """
+    if manifest.rebuild or not os.path.exists(out_path):
+        res.to_csv(out_path, index=False)
+    elif manifest.appends_only():
+        if not res.empty:
+            res.to_csv(out_path, mode="a", header=False, index=False)
+    else:
+        old = pd.read_csv(out_path, parse_dates=["date", "expiration"], float_precision="round_trip")
+        old_keys = [partition_key(d, sym) for d, sym in zip(old["date"], old["act_symbol"])]
+        old = old[~pd.Series(old_keys).isin(manifest.stale_keys()).to_numpy()]
+        merged = pd.concat([old, res], ignore_index=True) if not res.empty else old
+        merged = merged.sort_values(["date", "act_symbol"], kind="stable")
+        merged.to_csv(out_path, index=False)
+
+
+def write_streamed(sink: StreamingOutput, manifest: ScanManifest | None):
+    """Low-memory counterpart of to_csv / write_incremental for a streamed output."""
+    if manifest is None or manifest.rebuild or not os.path.exists(sink.path):
+        sink.replace()
+    elif manifest.appends_only():
+        sink.append()
+    else:
+        # older partitions changed: merged in memory like write_incremental
+        write_incremental(sink.read(), manifest, sink.path)
+        sink.discard()
+
+
+def streaming_outputs(outputs: dict, checks) -> dict[str, StreamingOutput]:
+    sinks = {mode: StreamingOutput(path, BOX_COLUMNS, ["profit_sell", "profit_buy"], [(COVID_START, COVID_END)])
+             for mode, path in outputs.items()}
+    for c in checks:
+        top = ["profit_buy", "profit_sell"] if c == "box" else ["profit"]
+        sinks[c] = StreamingOutput(CHECK_OUTPUTS[c], check_columns(c), top, summaries=False)
+    return sinks
+
+
+def run(outputs: dict = OUTPUTS, incremental: bool = INCREMENTAL, profile: bool = PROFILE,
+        checks=CHECKS, low_memory: bool = LOW_MEMORY) -> dict[str, pd.DataFrame]:
+    profiler = StageProfiler(PROFILE_MEMORY) if profile else NULL_PROFILER
+    all_outputs = {**outputs, **{c: CHECK_OUTPUTS[c] for c in checks}}
+    manifest = ScanManifest(MANIFEST, scan_config(all_outputs), list(all_outputs.values())) if incremental else None
+    # a full scan tracks episodes on the fly; an incremental one rereads the merged csv afterwards
+    full = manifest is None or manifest.rebuild
+    episodes = [m for m in EPISODES if m in outputs]
+    trackers = {m: EpisodeTracker(EPISODE_MAX_GAP) for m in episodes} if full else {}
+    sinks = streaming_outputs(outputs, checks) if low_memory else None
+    plan = plan_chunks(MEMORY_BUDGET_MB, WORKERS) if low_memory else None
+    results = scan(list(outputs), manifest, profiler, checks, trackers, sinks, plan)
+
+    for mode, res in results.items():
+        out_path = all_outputs[mode]
+        with profiler.stage(f"to_csv[{mode}]", rows_in=sinks[mode].n_rows if sinks else len(res)):
+            if sinks is not None:
+                write_streamed(sinks[mode], manifest)
+            elif manifest is not None:
+                write_incremental(res, manifest, out_path)
+            else:
+                res.to_csv(out_path, index=False)
+        if mode in checks:
+            continue
+
+        # daily / per-expiration summaries next to the csv (daily_summary.py)
+        summaries = sinks[mode].summaries() if sinks is not None else None
+        with profiler.stage(f"summary[{mode}]", rows_in=len(res)):
+            if manifest is None or manifest.rebuild:
+                update_summaries(out_path, res, summaries=summaries)
+            else:
+                update_summaries(out_path, res, replace=manifest.stale_keys() | manifest.scanned,
+                                 summaries=summaries)
+
+    for mode in episodes:
+        out_path = outputs[mode]
+        with profiler.stage(f"episodes[{mode}]") as st:
+            eps = (trackers[mode].episodes() if full else
+                   episodes_from_csv(out_path, manifest_partitions(manifest), EPISODE_MAX_GAP))
+            st.rows_out = len(eps)
+            path = write_episodes(out_path, eps)
+        print(f"[{mode}] {len(eps):,} episodes ({int(eps['open'].sum()):,} still open) -> {path}")
+
+    if profile:
+        profiler.stop()
+        profiler.write(PROFILE_OUT, config=scan_config(all_outputs), workers=WORKERS, use_cache=USE_CACHE,
+                       incremental=incremental, low_memory=asdict(plan) if plan is not None else None)
+        print(f"stage report written to {PROFILE_OUT}")
+
+    if manifest is not None:
+        counts = {}
+        for mode, res in results.items():
+            if sinks is not None:
+                counts[all_outputs[mode]] = sinks[mode].counts
+                continue
+            n = res.groupby(["date", "act_symbol"]).size() if not res.empty else {}
+            counts[all_outputs[mode]] = {partition_key(d, sym): c for (d, sym), c in dict(n).items()}
+        manifest.commit(counts)
+        print(f"incremental: scanned {len(manifest.scanned)} new/changed partitions"
+              f"{' (full rebuild)' if manifest.rebuild else ''}; the tables below cover only these rows.")
+
+    for mode, res in results.items():
+        if mode in checks:
+            report_check(mode, res)
+        else:
+            report(mode, res, sinks[mode].summaries()["daily"] if sinks is not None else None)
+    return results
+
+
+def report_check(check: str, res: pd.DataFrame):
+    if res.empty:
+        print(f"[{check}] No violations found after filters.")
+        return
+    profit = "profit_best" if check == "box" else "profit"
+    if check == "box":
+        res = res.assign(profit_best=res[["profit_buy", "profit_sell"]].max(axis=1))
+    print(f"\n[{check}] TOP VIOLATIONS ({len(res):,} rows):")
+    print(res.sort_values(profit, ascending=False).head(15).to_string(index=False))
 
-    res = pd.DataFrame(rows, columns=[
-        "date","act_symbol","expiration","K1","K2","payoff_pv",
-        "cost_buy","profit_buy","proceeds_sell","profit_sell","T_years"
-    ])
 
+def report(mode: str, res: pd.DataFrame, daily: pd.DataFrame | None = None):
+    """daily: the mode's daily summary, for the COVID daily table when res holds only the top rows."""
     if res.empty:
         print(f"[{mode}] No candidates found after filters.")
-        return res
-
-    res.to_csv(out_path, index=False)
+        return
 
     # overall top candidates
     print(f"\n[{mode}] TOP SELL-BOX (candidates):")
@@ -176,18 +405,24 @@ def run(mode: str, out_path: str):
         print(covid.sort_values("profit_buy", ascending=False).head(15).to_string(index=False))
 
         # simple daily summary
-        daily = (covid.assign(best_profit=covid[["profit_buy","profit_sell"]].max(axis=1))
-                      .groupby("date")
-                      .agg(n_candidates=("best_profit","size"),
-                           max_profit=("best_profit","max"))
-                      .sort_values("max_profit", ascending=False)
-                )
+        if daily is None:
+            daily = (covid.assign(best_profit=covid[["profit_buy","profit_sell"]].max(axis=1))
+                          .groupby("date")
+                          .agg(n_candidates=("best_profit","size"),
+                               max_profit=("best_profit","max"))
+                    )
+        else:
+            daily = (daily[(daily["date"] >= COVID_START) & (daily["date"] <= COVID_END)]
+                          .groupby("date")
+                          .agg(n_candidates=("n_candidates","sum"),
+                               max_profit=("best_profit","max"))
+                    )
+        daily = daily.sort_values("max_profit", ascending=False)
         print("\nDaily summary (COVID):")
         print(daily.head(20).to_string())
 
-    return res
-
 
-# run both modes
-res_all = run(mode="allpairs", out_path=OUT_ALL)
-res_adj = run(mode="adjacent", out_path=OUT_ADJ)
+# run every mode from a single scan
+if __name__ == "__main__":
+    results = run()
+    res_all, res_adj, res_best = results["allpairs"], results["adjacent"], results["best"]
@@ -0,0 +1,197 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from daily_summary import summary_path
+from scan_manifest import EMPTY_DIGEST, split_key
+
+# ----------------------------
+# OPPORTUNITY PERSISTENCE (EPISODES)
+# Follows each box (act_symbol, expiration, K1, K2) across scan dates: the
+# scanner feeds every scanned (date, act_symbol) partition in date order, and
+# a hash index per symbol holds the boxes that were candidates on that
+# symbol's previous scanned day. A box present again extends its episode,
+# a box missing for more than MAX_GAP scanned days closes it. Each candidate
+# row is touched once, so the cost is linear in the candidate rows (no
+# self-join of the output csv).
+#   <stem>.episodes.parquet   one row per episode:
+#   first_seen / last_seen, days present, first / peak / last best profit
+#   (max of profit_buy, profit_sell), the peak's date and side, decay from the
+#   peak to the last day, and open = still a candidate on the last scanned day
+#   python results/box_episodes.py spy_box_arbitrage_allpairs.csv
+# ----------------------------
+
+MAX_GAP = 0            # scanned days a box may be missing without ending its episode
+CHUNK_ROWS = 1_000_000
+
+EPISODE_COLUMNS = [
+    "act_symbol", "expiration", "K1", "K2", "first_seen", "last_seen", "days",
+    "first_profit", "peak_profit", "peak_date", "peak_side", "last_profit", "decay", "decay_per_day", "open",
+]
+
+# open-episode state, one list per box
+FIRST, LAST, SEQ, DAYS, P_FIRST, P_PEAK, PEAK_DATE, PEAK_BUY, P_LAST = range(9)
+
+
+class EpisodeTracker:
+    def __init__(self, max_gap: int = MAX_GAP):
+        self.max_gap = max_gap
+        self._seq: dict[str, int] = {}     # act_symbol -> index of its last scanned day
+        self._open: dict[str, dict] = {}   # act_symbol -> {(expiration ns, K1, K2): state}
+        self._closed: list[tuple] = []
+
+    def update(self, d, sym: str, expiration, K1, K2, profit_buy, profit_sell):
+        """Candidates of one scanned (date, act_symbol) partition; call for empty partitions too."""
+        d = pd.Timestamp(d)
+        seq = self._seq[sym] = self._seq.get(sym, -1) + 1
+        old = self._open.pop(sym, {})
+        new = {}
+        best = np.maximum(profit_buy, profit_sell).tolist()
+        buy = (np.asarray(profit_buy) >= np.asarray(profit_sell)).tolist()
+        keys = zip(np.asarray(expiration, dtype="datetime64[ns]").view(np.int64).tolist(),
+                   np.asarray(K1, dtype=np.float64).tolist(), np.asarray(K2, dtype=np.float64).tolist())
+
+        for key, p, b in zip(keys, best, buy):
+            st = new.get(key)
+            if st is not None:  # same box twice in one partition (e.g. best mode's buy and sell lists)
+                st[P_LAST] = max(st[P_LAST], p)
+            else:
+                st = old.pop(key, None)
+                if st is None:
+                    new[key] = [d, d, seq, 1, p, p, d, b, p]
+                    continue
+                st[LAST], st[SEQ], st[P_LAST] = d, seq, p
+                st[DAYS] += 1
+                new[key] = st
+            if p > st[P_PEAK]:
+                st[P_PEAK], st[PEAK_DATE], st[PEAK_BUY] = p, d, b
+
+        for key, st in old.items():
+            if seq - st[SEQ] > self.max_gap:
+                self._closed.append((sym, key, st))
+            else:
+                new[key] = st
+        self._open[sym] = new
+
+    def feed(self, res: pd.DataFrame, partitions):
+        """Scan output rows of the given scanned (date, act_symbol) partitions, both in scan order."""
+        if res.empty:
+            index = {}
+        else:
+            d = res["date"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+            sym = res["act_symbol"].to_numpy(dtype=object)
+            starts = np.flatnonzero(np.r_[True, (d[1:] != d[:-1]) | (sym[1:] != sym[:-1])])
+            ends = np.append(starts[1:], len(res))
+            index = {(d[s], sym[s]): (s, e) for s, e in zip(starts, ends)}
+
+        cols = [res[c].to_numpy() for c in ("expiration", "K1", "K2", "profit_buy", "profit_sell")]
+        for pd_, sym_ in partitions:
+            s, e = index.get((pd.Timestamp(pd_).value, sym_), (0, 0))
+            self.update(pd_, sym_, *(c[s:e] for c in cols))
+
+    def episodes(self) -> pd.DataFrame:
+        """Every episode so far; the ones still open at the last scanned day have open=True."""
+        rows = [(sym, key, st, False) for sym, key, st in self._closed]
+        rows += [(sym, key, st, True) for sym, boxes in self._open.items() for key, st in boxes.items()]
+        if not rows:
+            return pd.DataFrame(columns=EPISODE_COLUMNS)
+
+        sym, keys, states, is_open = zip(*rows)
+        exp, K1, K2 = (np.array(v) for v in zip(*keys))
+        st = list(zip(*states))
+        peak, last = np.array(st[P_PEAK]), np.array(st[P_LAST])
+        peak_date, last_seen = pd.DatetimeIndex(st[PEAK_DATE]), pd.DatetimeIndex(st[LAST])
+        days_since_peak = (last_seen - peak_date).days.to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per_day = np.where(days_since_peak > 0, (peak - last) / days_since_peak, np.nan)
+
+        out = pd.DataFrame({
+            "act_symbol": np.array(sym, dtype=object),
+            "expiration": pd.to_datetime(exp.astype("datetime64[ns]")),
+            "K1": K1,
+            "K2": K2,
+            "first_seen": pd.DatetimeIndex(st[FIRST]),
+            "last_seen": last_seen,
+            "days": np.array(st[DAYS], dtype=np.int64),
+            "first_profit": np.array(st[P_FIRST]),
+            "peak_profit": peak,
+            "peak_date": peak_date,
+            "peak_side": np.where(np.array(st[PEAK_BUY]), "buy", "sell").astype(object),
+            "last_profit": last,
+            "decay": peak - last,
+            "decay_per_day": per_day,
+            "open": np.array(is_open),
+        }, columns=EPISODE_COLUMNS)
+        return out.sort_values(["first_seen", "act_symbol", "expiration", "K1", "K2"], ignore_index=True)
+
+
+def _frame_partitions(res: pd.DataFrame) -> list[tuple]:
+    keys = res[["date", "act_symbol"]]
+    return list(keys[keys.ne(keys.shift()).any(axis=1)].itertuples(index=False, name=None))
+
+
+def episodes_from_csv(out_path: str, partitions: list[tuple] | None = None, max_gap: int = MAX_GAP,
+                      chunksize: int = CHUNK_ROWS) -> pd.DataFrame:
+    """Episodes of an existing scan output csv (sorted by date, act_symbol), read in chunks.
+
+    partitions: every scanned (date, act_symbol), e.g. from the scan manifest; by
+    default the partitions present in the csv, so days where a symbol had no
+    candidate at all are not counted as gaps.
+    """
+    tracker = EpisodeTracker(max_gap)
+    todo = sorted((pd.Timestamp(d), sym) for d, sym in partitions) if partitions is not None else None
+    pos = 0
+
+    def feed(frame: pd.DataFrame):
+        nonlocal pos
+        present = _frame_partitions(frame)
+        if todo is None or not present:
+            tracker.feed(frame, present)
+            return
+        end = pos
+        while end < len(todo) and todo[end] <= present[-1]:
+            end += 1
+        tracker.feed(frame, todo[pos:end])
+        pos = end
+
+    usecols = ["date", "act_symbol", "expiration", "K1", "K2", "profit_buy", "profit_sell"]
+    carry = None
+    for chunk in pd.read_csv(out_path, usecols=usecols, parse_dates=["date", "expiration"],
+                             float_precision="round_trip", chunksize=chunksize):
+        if chunk.empty:  # a header-only output
+            continue
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        # the last partition may continue in the next chunk
+        tail = ((chunk["date"] == chunk["date"].iat[-1]) & (chunk["act_symbol"] == chunk["act_symbol"].iat[-1])).to_numpy()
+        carry = chunk[tail]
+        feed(chunk[~tail])
+    feed(carry if carry is not None else pd.DataFrame(columns=usecols))
+    if todo is not None and pos < len(todo):
+        tracker.feed(pd.DataFrame(columns=usecols), todo[pos:])
+    return tracker.episodes()
+
+
+def manifest_partitions(manifest) -> list[tuple]:
+    """Every (date, act_symbol) the output of an incremental scan covers: the slices that had
+    quotes, as the full scan feeds its trackers (a slice whose strikes all drop out of the
+    call/put pairing still counts as a scanned day)."""
+    return [split_key(k) for k, digest in manifest.seen.items() if digest != EMPTY_DIGEST]
+
+
+def write_episodes(out_path: str, episodes: pd.DataFrame) -> str:
+    path = summary_path(out_path, "episodes")
+    episodes.to_parquet(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Episodes of boxes that stay candidates across scan dates.")
+    ap.add_argument("csv", nargs="?", default="spy_box_arbitrage_allpairs.csv")
+    ap.add_argument("--max-gap", type=int, default=MAX_GAP)
+    args = ap.parse_args()
+
+    eps = episodes_from_csv(args.csv, max_gap=args.max_gap)
+    print(f"{len(eps):,} episodes -> {write_episodes(args.csv, eps)}")
+    print(eps.sort_values(["days", "peak_profit"], ascending=False).head(15).to_string(index=False))
@@ -0,0 +1,224 @@
+import numpy as np
+
+# ----------------------------
+# VECTORIZED BOX-SPREAD ENGINE
+# Works on one (date, symbol, expiration) group given as strike-sorted arrays.
+# Long box cost:  +C(K1) -C(K2) -P(K1) +P(K2)
+# cost_buy      = C1_ask - C2_bid + P2_ask - P1_bid
+# proceeds_sell = C1_bid - C2_ask + P2_bid - P1_ask
+# The arithmetic is done in the same order as the old per-pair loops so the
+# numbers come out bit-for-bit identical.
+# ----------------------------
+
+# number of best buy / sell boxes kept per expiry in mode="best"
+TOP_K = 5
+
+# max number of (K1, K2) cells evaluated per broadcast step in all-pairs mode
+# (each temporary is CHUNK_CELLS * 8 bytes)
+CHUNK_CELLS = 2_000_000
+
+SCAN_MODES = ("adjacent", "allpairs", "best")
+
+PAIR_FIELDS = ["i", "j", "K1", "K2", "payoff_pv",
+               "cost_buy", "profit_buy", "proceeds_sell", "profit_sell"]
+
+
+def _box_metrics(K1, K2, C1a, C1b, P1a, P1b, C2a, C2b, P2a, P2b, disc):
+    payoff_pv = (K2 - K1) * disc
+
+    cost_buy = C1a - C2b + P2a - P1b
+    profit_buy = payoff_pv - cost_buy
+
+    proceeds_sell = C1b - C2a + P2b - P1a
+    profit_sell = proceeds_sell - payoff_pv
+
+    return payoff_pv, cost_buy, profit_buy, proceeds_sell, profit_sell
+
+
+def _keep_mask(profit_buy, profit_sell, min_profit):
+    if min_profit is None:
+        return np.ones(profit_buy.shape, dtype=bool)
+    return (profit_buy >= min_profit) | (profit_sell >= min_profit)
+
+
+def _empty_pairs():
+    out = {f: np.empty(0, dtype=np.float64) for f in PAIR_FIELDS}
+    out["i"] = np.empty(0, dtype=np.intp)
+    out["j"] = np.empty(0, dtype=np.intp)
+    return out
+
+
+def _pairs_at(i, j, K, cb, ca, pb, pa, disc, min_profit):
+    metrics = _box_metrics(K[i], K[j], ca[i], cb[i], pa[i], pb[i],
+                           ca[j], cb[j], pa[j], pb[j], disc)
+    keep = _keep_mask(metrics[2], metrics[4], min_profit)
+    i, j = i[keep], j[keep]
+    return dict(zip(PAIR_FIELDS, [i, j, K[i], K[j], *(m[keep] for m in metrics)]))
+
+
+def _top_k_pairs(gain: np.ndarray, loss: np.ndarray, k: int) -> list:
+    """The k pairs i < j with the largest gain[j] - loss[i] (ties go to the smaller i, j).
+
+    O(n + k^3) for n strikes, i.e. linear in n for a fixed k:
+      - j's best pair is gain[j] - min(loss[:j]) (one running minimum), and
+        only the k j's with the best such pairs can be in the top k: each
+        of them beats every pair of any other j
+      - for those j's, the i's that can pair with them are the k smallest
+        loss[i] of each stretch between consecutive chosen j's (argpartition)
+      - the k^2 x k candidate pairs are ranked directly
+    """
+    n = len(gain)
+    if n < 2 or k <= 0:
+        return []
+    best_j = gain[1:] - np.minimum.accumulate(loss[:-1])  # for j = 1..n-1
+    J = np.sort(np.argpartition(-best_j, min(k, n - 1) - 1)[:k] + 1)
+
+    starts = np.r_[0, J[:-1]]
+    cand = []
+    for a, b in zip(starts, J):
+        seg = loss[a:b]
+        cand.append(a + (np.argpartition(seg, k - 1)[:k] if len(seg) > k else np.arange(len(seg))))
+    I = np.unique(np.concatenate(cand))
+
+    i, j = (x.ravel() for x in np.meshgrid(I, J, indexing="ij"))
+    i, j = i[i < j], j[i < j]
+    top = np.lexsort((j, i, -(gain[j] - loss[i])))[:k]
+    return list(zip(i[top].tolist(), j[top].tolist()))
+
+
+def box_pairs(strikes, call_bid, call_ask, put_bid, put_ask,
+              disc: float = 1.0, mode: str = "allpairs",
+              min_profit: float | None = None, chunk_cells: int = CHUNK_CELLS,
+              top_k: int = TOP_K) -> dict:
+    """Box metrics for strike pairs K1 < K2 of one expiry, in (i, j) loop order.
+
+    mode="adjacent" scans j = i + 1 only, mode="allpairs" the whole upper triangle.
+    mode="best" returns the top_k buy boxes and the top_k sell boxes (their union)
+    without visiting every pair.
+    If min_profit is set, only pairs where either side clears it are returned.
+    Returns a dict of 1-D arrays keyed by PAIR_FIELDS.
+    """
+    K = np.asarray(strikes, dtype=np.float64)
+    cb = np.asarray(call_bid, dtype=np.float64)
+    ca = np.asarray(call_ask, dtype=np.float64)
+    pb = np.asarray(put_bid, dtype=np.float64)
+    pa = np.asarray(put_ask, dtype=np.float64)
+    n = len(K)
+
+    if n < 2:
+        return _empty_pairs()
+
+    if mode == "adjacent":
+        i = np.arange(n - 1)
+        j = i + 1
+        return _pairs_at(i, j, K, cb, ca, pb, pa, disc, min_profit)
+
+    if mode == "best":
+        # profit_buy  = (K2 d + C2_bid - P2_ask) - (K1 d + C1_ask - P1_bid)
+        # profit_sell = (K1 d + C1_bid - P1_ask) - (K2 d + C2_ask - P2_bid)
+        # so each side is a K2-only term minus a K1-only term. The split only
+        # ranks the pairs; the reported metrics are recomputed the usual way.
+        Kd = K * disc
+        buy = _top_k_pairs(Kd + cb - pa, Kd + ca - pb, top_k)
+        sell = _top_k_pairs(-(Kd + ca - pb), -(Kd + cb - pa), top_k)
+
+        ij = np.array(sorted(set(buy) | set(sell)), dtype=np.intp).reshape(-1, 2)
+        i, j = ij[:, 0], ij[:, 1]
+        return _pairs_at(i, j, K, cb, ca, pb, pa, disc, min_profit)
+
+    if mode != "allpairs":
+        raise ValueError(f"Unknown scan mode: {mode!r}")
+
+    # all pairs: broadcast a block of K1 rows against every K2 > K1 column
+    rows_per_chunk = max(1, chunk_cells // n)
+    parts = []
+    for a in range(0, n - 1, rows_per_chunk):
+        b = min(a + rows_per_chunk, n - 1)
+        r = slice(a, b)
+        c = slice(a + 1, n)
+
+        metrics = _box_metrics(
+            K[r, None], K[None, c],
+            ca[r, None], cb[r, None], pa[r, None], pb[r, None],
+            ca[None, c], cb[None, c], pa[None, c], pb[None, c],
+            disc,
+        )
+        upper = np.arange(a + 1, n)[None, :] > np.arange(a, b)[:, None]
+        keep = upper & _keep_mask(metrics[2], metrics[4], min_profit)
+
+        ii, jj = np.nonzero(keep)  # row-major == the old i/j loop order
+        ii += a
+        jj += a + 1
+        parts.append([ii, jj, K[ii], K[jj], *(m[keep] for m in metrics)])
+
+    return {f: np.concatenate([p[k] for p in parts]) for k, f in enumerate(PAIR_FIELDS)}
+
+
+def downselect(call_bid, call_ask, put_bid, put_ask, max_strikes: int) -> np.ndarray:
+    """Indices of the max_strikes tightest-spread strikes, back in strike order."""
+    call_spread = (call_ask - call_bid) / np.maximum(call_ask, 1e-9)
+    put_spread = (put_ask - put_bid) / np.maximum(put_ask, 1e-9)
+    keep = np.argsort(call_spread + put_spread, kind="quicksort")[:max_strikes]
+    return np.sort(keep)
+
+
+def scan_groups(offsets, T, strike, call_bid, call_ask, put_bid, put_ask,
+                modes=("allpairs",), r: float = 0.0, min_profit: float | None = None,
+                max_strikes: int | None = None, top_k: int = TOP_K) -> dict:
+    """box_pairs over every group of a packed leg block (see option_chain.LegGroups).
+
+    Group g owns rows offsets[g]:offsets[g + 1] and has T[g] years to expiry.
+    All requested modes are filled in one pass over the groups: the strike
+    downselect (groups with more than max_strikes strikes keep the tightest-
+    spread ones; not applied in "best" mode) is done once per group, and when
+    "allpairs" is requested "adjacent" is read off its j = i + 1 diagonal.
+    Returns {mode: pairs} with PAIR_FIELDS plus "group" and "T_years", where
+    i / j index rows of the packed block.
+    """
+    unknown = set(modes) - set(SCAN_MODES)
+    if unknown:
+        raise ValueError(f"Unknown scan mode(s): {sorted(unknown)}")
+    parts = {m: [] for m in modes}
+
+    def add(mode, pairs, rows, g):
+        pairs["i"] = rows[pairs["i"]]
+        pairs["j"] = rows[pairs["j"]]
+        pairs["group"] = np.full(len(pairs["i"]), g, dtype=np.intp)
+        pairs["T_years"] = np.full(len(pairs["i"]), T[g])
+        parts[mode].append(pairs)
+
+    for g in range(len(offsets) - 1):
+        all_rows = np.arange(offsets[g], offsets[g + 1])
+        if len(all_rows) < 2:
+            continue
+
+        rows = all_rows
+        if max_strikes is not None and len(rows) > max_strikes:
+            rows = rows[downselect(call_bid[rows], call_ask[rows], put_bid[rows], put_ask[rows], max_strikes)]
+
+        disc = np.exp(-r * T[g])
+        legs = (call_bid[rows], call_ask[rows], put_bid[rows], put_ask[rows])
+
+        if "allpairs" in parts:
+            pairs = box_pairs(strike[rows], *legs, disc=disc, mode="allpairs", min_profit=min_profit)
+            if "adjacent" in parts:
+                diag = pairs["j"] == pairs["i"] + 1
+                add("adjacent", {f: v[diag] for f, v in pairs.items()}, rows, g)
+            add("allpairs", pairs, rows, g)
+        elif "adjacent" in parts:
+            add("adjacent", box_pairs(strike[rows], *legs, disc=disc, mode="adjacent", min_profit=min_profit), rows, g)
+
+        if "best" in parts:
+            add("best", box_pairs(strike[all_rows], call_bid[all_rows], call_ask[all_rows],
+                                  put_bid[all_rows], put_ask[all_rows],
+                                  disc=disc, mode="best", min_profit=min_profit, top_k=top_k), all_rows, g)
+
+    out = {}
+    for mode, chunks in parts.items():
+        if chunks:
+            out[mode] = {f: np.concatenate([c[f] for c in chunks]) for f in chunks[0]}
+        else:
+            out[mode] = _empty_pairs()
+            out[mode]["group"] = np.empty(0, dtype=np.intp)
+            out[mode]["T_years"] = np.empty(0, dtype=np.float64)
+    return out
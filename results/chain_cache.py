@@ -0,0 +1,144 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+
+from option_chain import CHAIN_COLUMNS, best_quotes, clean_quotes, iter_chain_slices
+
+# ----------------------------
+# COLUMNAR CHAIN CACHE
+# One-time conversion of the csv export into the cleaned best-bid/min-ask chain,
+# one uncompressed Arrow (feather v2) file per date so reads can be memory-mapped.
+#   <cache_dir>/date=YYYY-MM-DD.arrow
+#   <cache_dir>/_source.json   fingerprint of the csv the cache was built from
+# The cache is rebuilt automatically when the csv's size/mtime changes.
+# ----------------------------
+
+CACHE_VERSION = 1
+PRICE_COLUMNS = ["strike", "bid", "ask"]
+SOURCE_FILE = "_source.json"
+
+
+def default_cache_dir(csv_path: str) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.parent / ".cache" / csv_path.stem
+
+
+def _fingerprint(csv_path: str) -> dict:
+    st = os.stat(csv_path)
+    return {
+        "source": str(Path(csv_path).resolve()),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "version": CACHE_VERSION,
+    }
+
+
+def cache_is_fresh(csv_path: str, cache_dir: str | Path | None = None) -> bool:
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir(csv_path)
+    try:
+        with open(cache_dir / SOURCE_FILE) as f:
+            return json.load(f) == _fingerprint(csv_path)
+    except (OSError, ValueError):
+        return False
+
+
+def _encode(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorical symbols/sides; prices as int32 cents when that round-trips exactly."""
+    out = df[CHAIN_COLUMNS].reset_index(drop=True)
+    out["act_symbol"] = out["act_symbol"].astype("category")
+    out["call_put"] = out["call_put"].astype("category")
+    for col in PRICE_COLUMNS:
+        x = out[col].to_numpy(dtype=np.float64)
+        cents = np.round(x * 100)
+        if len(x) and np.abs(cents).max() < 2**31 and np.array_equal(cents / 100, x):
+            out[col] = cents.astype(np.int32)
+    return out
+
+
+def _decode(df: pd.DataFrame) -> pd.DataFrame:
+    for col in PRICE_COLUMNS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].to_numpy() / 100.0
+    return df
+
+
+def build_chain_cache(csv_path: str, cache_dir: str | Path | None = None, force: bool = False) -> Path:
+    """Converts the csv export into the per-date cache (no-op if it is already fresh)."""
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir(csv_path)
+    if not force and cache_is_fresh(csv_path, cache_dir):
+        return cache_dir
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    (cache_dir / SOURCE_FILE).unlink(missing_ok=True)  # stale until the rebuild completes
+    for old in cache_dir.glob("date=*.arrow"):
+        old.unlink()
+
+    def flush(d, parts):
+        day = _encode(pd.concat(parts, ignore_index=True))
+        feather.write_feather(day, cache_dir / f"date={d:%Y-%m-%d}.arrow", compression="uncompressed")
+
+    current, parts = None, []
+    for d, _, raw in iter_chain_slices(csv_path):
+        if current is not None and d != current:
+            flush(current, parts)
+            parts = []
+        current = d
+        agg = best_quotes(clean_quotes(raw))
+        if not agg.empty:
+            parts.append(agg)
+    if parts:
+        flush(current, parts)
+
+    tmp = cache_dir / (SOURCE_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(_fingerprint(csv_path), f)
+    os.replace(tmp, cache_dir / SOURCE_FILE)
+    return cache_dir
+
+
+def cached_dates(cache_dir: str | Path, start=None, end=None) -> list[pd.Timestamp]:
+    dates = sorted(pd.Timestamp(f.stem.split("=", 1)[1]) for f in Path(cache_dir).glob("date=*.arrow"))
+    if start is not None:
+        dates = [d for d in dates if d >= pd.Timestamp(start)]
+    if end is not None:
+        dates = [d for d in dates if d <= pd.Timestamp(end)]
+    return dates
+
+
+def read_partition(cache_dir: str | Path, d, columns: list[str] | None = None) -> pd.DataFrame:
+    path = Path(cache_dir) / f"date={pd.Timestamp(d):%Y-%m-%d}.arrow"
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return _decode(table.to_pandas())
+
+
+def iter_cached_slices(csv_path: str, start=None, end=None, columns: list[str] | None = None,
+                       cache_dir: str | Path | None = None):
+    """Same contract as iter_chain_slices, but rows are already cleaned and deduplicated."""
+    cache_dir = build_chain_cache(csv_path, cache_dir)
+    for d in cached_dates(cache_dir, start, end):
+        day = read_partition(cache_dir, d, columns)
+        if "act_symbol" not in day.columns:
+            yield d, None, day
+            continue
+        for sym, rows in day.groupby("act_symbol", sort=True, observed=True):
+            yield d, sym, rows
+
+
+def load_chain(csv_path: str, start=None, end=None, columns: list[str] | None = None,
+               cache_dir: str | Path | None = None) -> pd.DataFrame:
+    """Cleaned chain for [start, end], reading only the requested columns and dates."""
+    cache_dir = build_chain_cache(csv_path, cache_dir)
+    parts = [read_partition(cache_dir, d, columns) for d in cached_dates(cache_dir, start, end)]
+    if not parts:
+        return pd.DataFrame(columns=columns or CHAIN_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+if __name__ == "__main__":
+    src = "./options/spy_option_chain.csv"
+    out = build_chain_cache(src, force=True)
+    print(f"cached {len(cached_dates(out))} trading days from {src} -> {out}")
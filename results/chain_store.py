@@ -0,0 +1,251 @@
+import argparse
+import sqlite3
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from option_chain import CHAIN_COLUMNS, best_quotes, clean_quotes, iter_chain_slices
+
+# ----------------------------
+# SQLITE CHAIN STORE
+# Cleaned best-bid/min-ask quotes in a local SQLite file, keyed and indexed by
+# (act_symbol, date, expiration, strike, call_put), plus one row per expiry
+# with its days-to-expiry and a put-call-parity forward estimate.
+#   quotes(act_symbol, date, expiration, strike, call_put, bid, ask)
+#   expiries(act_symbol, date, expiration, dte, forward)
+# Dolt csv exports are bulk-ingested per (date, act_symbol), replacing what
+# the store held for those days, so new exports can be appended any time.
+# Loads take a ChainFilter (date / expiry / DTE / moneyness) that becomes
+# the WHERE clause, so only the matching rows ever leave the database.
+#   python results/chain_store.py ingest options/spy_option_chain.csv
+# ----------------------------
+
+DEFAULT_DB = "./options/spy_chain.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    act_symbol TEXT NOT NULL,
+    date       TEXT NOT NULL,  -- YYYY-MM-DD
+    expiration TEXT NOT NULL,  -- YYYY-MM-DD
+    strike     REAL NOT NULL,
+    call_put   TEXT NOT NULL,
+    bid        REAL NOT NULL,
+    ask        REAL NOT NULL,
+    PRIMARY KEY (act_symbol, date, expiration, strike, call_put)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS expiries (
+    act_symbol TEXT NOT NULL,
+    date       TEXT NOT NULL,
+    expiration TEXT NOT NULL,
+    dte        INTEGER NOT NULL,
+    forward    REAL,           -- NULL when no strike has both a call and a put
+    PRIMARY KEY (act_symbol, date, expiration)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS expiries_by_date ON expiries (date, act_symbol);
+"""
+
+
+@dataclass
+class ChainFilter:
+    """Predicates on the chain; None = unbounded. Ranges are inclusive.
+
+    Moneyness is strike / forward, the forward being estimated per expiry
+    from put-call parity at the strike where call and put mids are closest.
+    """
+    symbols: tuple[str, ...] | None = None
+    start: str | None = None          # trade dates
+    end: str | None = None
+    exp_start: str | None = None      # expirations
+    exp_end: str | None = None
+    min_dte: int | None = None        # calendar days to expiry
+    max_dte: int | None = None
+    min_moneyness: float | None = None
+    max_moneyness: float | None = None
+
+    def is_empty(self) -> bool:
+        return all(v is None for v in asdict(self).values())
+
+    def expiry_where(self) -> tuple[str, list]:
+        """WHERE clause (and params) on the expiries table, aliased e."""
+        conds, params = [], []
+        if self.symbols is not None:
+            conds.append(f"e.act_symbol IN ({','.join('?' * len(self.symbols))})")
+            params += list(self.symbols)
+        for col, op, value in (("e.date", ">=", _day(self.start)), ("e.date", "<=", _day(self.end)),
+                               ("e.expiration", ">=", _day(self.exp_start)),
+                               ("e.expiration", "<=", _day(self.exp_end)),
+                               ("e.dte", ">=", self.min_dte), ("e.dte", "<=", self.max_dte)):
+            if value is not None:
+                conds.append(f"{col} {op} ?")
+                params.append(value)
+        return " AND ".join(conds) or "1", params
+
+    def strike_where(self) -> tuple[str, list]:
+        """Moneyness bounds on quotes q joined to expiries e."""
+        conds, params = [], []
+        if self.min_moneyness is not None:
+            conds.append("q.strike >= e.forward * ?")
+            params.append(self.min_moneyness)
+        if self.max_moneyness is not None:
+            conds.append("q.strike <= e.forward * ?")
+            params.append(self.max_moneyness)
+        return " AND ".join(conds) or "1", params
+
+    def apply(self, agg: pd.DataFrame) -> pd.DataFrame:
+        """Same predicates on an in-memory slice (for the csv / arrow cache paths)."""
+        if self.is_empty() or agg.empty:
+            return agg
+        keep = np.ones(len(agg), dtype=bool)
+        if self.symbols is not None:
+            keep &= agg["act_symbol"].isin(self.symbols).to_numpy()
+        dte = (agg["expiration"] - agg["date"]).dt.days.to_numpy()
+        for col, lo, hi in (("date", self.start, self.end), ("expiration", self.exp_start, self.exp_end)):
+            if lo is not None:
+                keep &= (agg[col] >= pd.Timestamp(lo)).to_numpy()
+            if hi is not None:
+                keep &= (agg[col] <= pd.Timestamp(hi)).to_numpy()
+        if self.min_dte is not None:
+            keep &= dte >= self.min_dte
+        if self.max_dte is not None:
+            keep &= dte <= self.max_dte
+        if self.min_moneyness is not None or self.max_moneyness is not None:
+            fwd = agg[["date", "act_symbol", "expiration"]].merge(
+                expiry_forwards(agg), on=["date", "act_symbol", "expiration"], how="left")["forward"].to_numpy()
+            m = agg["strike"].to_numpy() / fwd  # NaN forward -> dropped
+            if self.min_moneyness is not None:
+                keep &= m >= self.min_moneyness
+            if self.max_moneyness is not None:
+                keep &= m <= self.max_moneyness
+        return agg[keep]
+
+
+def _day(d) -> str | None:
+    return None if d is None else f"{pd.Timestamp(d):%Y-%m-%d}"
+
+
+def expiry_forwards(agg: pd.DataFrame) -> pd.DataFrame:
+    """Per (date, act_symbol, expiration): dte and forward = K + C_mid - P_mid at min |C_mid - P_mid|."""
+    keys = ["date", "act_symbol", "expiration"]
+    mids = agg.assign(mid=(agg["bid"] + agg["ask"]) / 2)
+    legs = mids.pivot_table(index=keys + ["strike"], columns="call_put", values="mid", observed=True)
+    exps = agg[keys].drop_duplicates().reset_index(drop=True)
+    exps["dte"] = (exps["expiration"] - exps["date"]).dt.days.astype(np.int64)
+    if {"Call", "Put"} <= set(legs.columns):
+        legs = legs.dropna(subset=["Call", "Put"]).reset_index()
+        legs["gap"] = legs["Call"] - legs["Put"]
+        atm = legs.loc[legs["gap"].abs().groupby([legs[k] for k in keys], observed=True).idxmin().to_numpy()]
+        atm = atm.assign(forward=atm["strike"] + atm["gap"])[keys + ["forward"]]
+        exps = exps.merge(atm, on=keys, how="left")
+    else:
+        exps["forward"] = np.nan
+    return exps
+
+
+def connect(db_path: str = DEFAULT_DB) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _rows(df: pd.DataFrame, columns: list[str]):
+    out = df[columns].copy()
+    for col in ("date", "expiration"):
+        if col in out.columns:
+            out[col] = out[col].dt.strftime("%Y-%m-%d")
+    return out.itertuples(index=False, name=None)
+
+
+def ingest_csv(csv_path: str, db_path: str = DEFAULT_DB) -> int:
+    """Bulk-loads a dolt csv export (cleaned, best quotes) into the store.
+
+    Every (date, act_symbol) in the file replaces what the store held for it.
+    Returns the number of quote rows written.
+    """
+    conn = connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    n = 0
+    try:
+        for d, sym, raw in iter_chain_slices(csv_path):
+            agg = best_quotes(clean_quotes(raw))
+            params = (sym, _day(d))
+            with conn:  # one transaction per (date, act_symbol)
+                conn.execute("DELETE FROM quotes WHERE act_symbol = ? AND date = ?", params)
+                conn.execute("DELETE FROM expiries WHERE act_symbol = ? AND date = ?", params)
+                if agg.empty:
+                    continue
+                conn.executemany("INSERT INTO quotes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                 _rows(agg, ["act_symbol", "date", "expiration", "strike", "call_put", "bid", "ask"]))
+                fwd = expiry_forwards(agg)
+                fwd["forward"] = fwd["forward"].astype(object).where(fwd["forward"].notna(), None)
+                conn.executemany("INSERT INTO expiries VALUES (?, ?, ?, ?, ?)",
+                                 _rows(fwd, ["act_symbol", "date", "expiration", "dte", "forward"]))
+            n += len(agg)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return n
+
+
+def store_partitions(conn: sqlite3.Connection, flt: ChainFilter | None = None) -> list[tuple[str, str]]:
+    """(date, act_symbol) pairs with at least one expiry matching the filter, in date order."""
+    where, params = (flt or ChainFilter()).expiry_where()
+    return conn.execute(f"SELECT DISTINCT e.date, e.act_symbol FROM expiries e WHERE {where} "
+                        "ORDER BY e.date, e.act_symbol", params).fetchall()
+
+
+def read_store_slice(conn: sqlite3.Connection, d: str, sym: str, flt: ChainFilter | None = None) -> pd.DataFrame:
+    flt = flt or ChainFilter()
+    e_where, e_params = flt.expiry_where()
+    s_where, s_params = flt.strike_where()
+    sql = (
+        "SELECT q.date, q.act_symbol, q.expiration, q.strike, q.call_put, q.bid, q.ask "
+        "FROM expiries e JOIN quotes q "
+        "ON q.act_symbol = e.act_symbol AND q.date = e.date AND q.expiration = e.expiration "
+        f"WHERE e.act_symbol = ? AND e.date = ? AND {e_where} AND {s_where} "
+        "ORDER BY q.expiration, q.strike, q.call_put"
+    )
+    df = pd.read_sql_query(sql, conn, params=[sym, d, *e_params, *s_params])
+    for col in ("date", "expiration"):
+        df[col] = pd.to_datetime(df[col], format="%Y-%m-%d")
+    return df[CHAIN_COLUMNS]
+
+
+def iter_store_slices(db_path: str = DEFAULT_DB, flt: ChainFilter | None = None):
+    """Same contract as chain_cache.iter_cached_slices: yields (date, act_symbol, cleaned quotes)."""
+    conn = connect(db_path)
+    try:
+        for d, sym in store_partitions(conn, flt):
+            yield pd.Timestamp(d), sym, read_store_slice(conn, d, sym, flt)
+    finally:
+        conn.close()
+
+
+def load_store(db_path: str = DEFAULT_DB, flt: ChainFilter | None = None) -> pd.DataFrame:
+    """Every quote matching the filter as one frame."""
+    parts = [agg for _, _, agg in iter_store_slices(db_path, flt)]
+    if not parts:
+        return pd.DataFrame(columns=CHAIN_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="SQLite store for dolt option-chain exports.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ing = sub.add_parser("ingest", help="bulk-load a csv export (replaces the days it contains)")
+    ing.add_argument("csv")
+    ing.add_argument("--db", default=DEFAULT_DB)
+    info = sub.add_parser("info", help="row counts and date range")
+    info.add_argument("--db", default=DEFAULT_DB)
+    args = ap.parse_args()
+
+    if args.cmd == "ingest":
+        n = ingest_csv(args.csv, args.db)
+        print(f"{n:,} quotes from {args.csv} -> {args.db}")
+    else:
+        conn = connect(args.db)
+        (n_q,), = conn.execute("SELECT COUNT(*) FROM quotes").fetchall()
+        lo, hi, n_days = conn.execute("SELECT MIN(date), MAX(date), COUNT(DISTINCT date) FROM expiries").fetchone()
+        print(f"{n_q:,} quotes, {n_days} trading days {lo} -> {hi}")
+        conn.close()
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from scan_manifest import partition_key
+
+# ----------------------------
+# MATERIALIZED DAILY SUMMARIES
+# Next to each scan output <stem>.csv the scan keeps two small parquet tables
+#   <stem>.daily.parquet   one row per (date, act_symbol)
+#   <stem>.expiry.parquet  one row per (date, act_symbol, expiration)
+# with the candidate count, max / median / min of profit_buy and profit_sell and
+# the best pair (largest of profit_buy / profit_sell). Rows are per scan
+# partition, so an incremental run only replaces the partitions it rescanned.
+# The plotting scripts read these instead of the full candidate csv.
+# ----------------------------
+
+LEVELS = {
+    "daily": ["date", "act_symbol"],
+    "expiry": ["date", "act_symbol", "expiration"],
+}
+STATS = ["n_candidates", "buy_max", "buy_med", "buy_min", "sell_max", "sell_med", "sell_min"]
+BEST = ["best_profit", "best_side", "best_expiration", "best_K1", "best_K2"]
+
+
+def summary_path(out_path: str, level: str = "daily") -> str:
+    return f"{os.path.splitext(out_path)[0]}.{level}.parquet"
+
+
+def summarize(res: pd.DataFrame, level: str = "daily") -> pd.DataFrame:
+    """Per-group stats + best pair of a scan output frame (BOX_COLUMNS)."""
+    keys = LEVELS[level]
+    cols = keys + STATS + BEST
+    if res.empty:
+        return pd.DataFrame(columns=cols)
+
+    best = np.maximum(res["profit_buy"].to_numpy(), res["profit_sell"].to_numpy())
+    res = res.assign(_best=best)
+    g = res.groupby(keys, sort=True, observed=True)
+    out = g.agg(
+        n_candidates=("profit_buy", "size"),
+        buy_max=("profit_buy", "max"),
+        buy_med=("profit_buy", "median"),
+        buy_min=("profit_buy", "min"),
+        sell_max=("profit_sell", "max"),
+        sell_med=("profit_sell", "median"),
+        sell_min=("profit_sell", "min"),
+    )
+
+    top = res.loc[g["_best"].idxmax().to_numpy()]
+    out["best_profit"] = top["_best"].to_numpy()
+    out["best_side"] = np.where(top["profit_buy"].to_numpy() >= top["profit_sell"].to_numpy(), "buy", "sell")
+    out["best_expiration"] = top["expiration"].to_numpy()
+    out["best_K1"] = top["K1"].to_numpy()
+    out["best_K2"] = top["K2"].to_numpy()
+    return out.reset_index()[cols]
+
+
+def _write(df: pd.DataFrame, path: str):
+    tmp = path + ".tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def update_summaries(out_path: str, res: pd.DataFrame | None, replace: set[str] | None = None,
+                     summaries: dict[str, pd.DataFrame] | None = None):
+    """Writes the summaries of out_path.
+
+    replace=None: res is the whole output, summaries are rebuilt from it.
+    Otherwise res holds only the rescanned partitions; rows of the partition
+    keys in `replace` are dropped from the stored summaries and res's are added.
+    summaries: summarize(res, level) per level, already computed (res may then be None).
+    """
+    for level in LEVELS:
+        path = summary_path(out_path, level)
+        new = summaries[level] if summaries is not None else summarize(res, level)
+        if replace is not None:
+            if not os.path.exists(path):
+                # first incremental run after upgrading: summarize what is already on disk
+                if os.path.exists(out_path):
+                    update_summaries(out_path, pd.read_csv(out_path, parse_dates=["date", "expiration"]))
+                else:
+                    update_summaries(out_path, res, summaries=summaries)
+                return
+            old = pd.read_parquet(path)
+            keys = [partition_key(d, sym) for d, sym in zip(old["date"], old["act_symbol"])]
+            old = old[~pd.Series(keys, dtype=object).isin(replace).to_numpy()]
+            new = pd.concat([old, new], ignore_index=True) if not new.empty else old
+            new = new.sort_values(LEVELS[level], kind="stable", ignore_index=True)
+        _write(new, path)
+
+
+def load_summary(out_path: str = "spy_box_arbitrage_allpairs.csv", level: str = "daily",
+                 symbol: str | None = None) -> pd.DataFrame:
+    """Reads a stored summary; builds it from the csv once if the scan has not written it yet."""
+    path = summary_path(out_path, level)
+    if not os.path.exists(path):
+        update_summaries(out_path, pd.read_csv(out_path, parse_dates=["date", "expiration"]))
+    df = pd.read_parquet(path)
+    if symbol is not None:
+        df = df[df["act_symbol"] == symbol]
+    return df
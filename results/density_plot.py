@@ -0,0 +1,143 @@
+import argparse
+import os
+
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.colors import LogNorm
+
+from daily_summary import load_summary
+
+# ----------------------------
+# DENSITY RENDERING FOR ALL-ROWS PLOTS
+# Instead of one scatter marker per candidate row, (date, profit) is binned
+# into a calendar-day x profit grid, read from the csv in chunks so the rows
+# are never all in memory, and the grid is drawn as one image. The axis
+# ranges and the optional per-day max / min overlay come from the daily
+# summary (daily_summary.py), so the csv is read exactly once.
+#   python results/density_plot.py --out reports/   (headless, writes PNGs)
+# ----------------------------
+
+OUT_ALL = "spy_box_arbitrage_allpairs.csv"
+CHUNK_ROWS = 1_000_000
+Y_BINS = 400
+DPI = 150
+
+# summary columns holding the per-day extrema of each profit column
+EXTREMA = {"profit_sell": ("sell_min", "sell_max"), "profit_buy": ("buy_min", "buy_max")}
+
+
+def density_grid(csv_path: str, columns: list[str], start, end, y_range: tuple[float, float],
+                 y_bins: int = Y_BINS, symbol: str | None = None,
+                 chunksize: int = CHUNK_ROWS) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Counts of rows per (profit bin, calendar day) for each column.
+
+    Returns ({column: (y_bins, n_days) int64 grid}, y bin edges). Days run
+    from start to end inclusive; values outside y_range land in the edge bins.
+    With symbol, only that act_symbol's rows are counted.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    n_days = (end - start).days + 1
+    lo, hi = y_range
+    if not hi > lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    edges = np.linspace(lo, hi, y_bins + 1)
+    grids = {c: np.zeros(y_bins * n_days, dtype=np.int64) for c in columns}
+
+    usecols = ["date", *columns] + (["act_symbol"] if symbol is not None else [])
+    for chunk in pd.read_csv(csv_path, usecols=usecols, parse_dates=["date"], chunksize=chunksize):
+        x = ((chunk["date"] - start) // pd.Timedelta(days=1)).to_numpy()
+        inside = (x >= 0) & (x < n_days)
+        if symbol is not None:
+            inside &= (chunk["act_symbol"] == symbol).to_numpy()
+        for c in columns:
+            v = chunk[c].to_numpy(dtype=np.float64)
+            ok = inside & ~np.isnan(v)
+            y = np.clip(((v[ok] - lo) / (hi - lo) * y_bins).astype(np.int64), 0, y_bins - 1)
+            grids[c] += np.bincount(y * n_days + x[ok], minlength=y_bins * n_days)
+
+    return {c: g.reshape(y_bins, n_days) for c, g in grids.items()}, edges
+
+
+def draw_density(ax, grid: np.ndarray, start, edges: np.ndarray, cmap: str = "viridis",
+                 label: str | None = None, alpha: float = 1.0):
+    """Draws a density_grid() grid as an image on ax (log color scale, empty cells transparent)."""
+    x0 = mdates.date2num(pd.Timestamp(start))
+    n_days = grid.shape[1]
+    masked = np.ma.masked_equal(grid, 0)
+    img = ax.imshow(masked, origin="lower", aspect="auto", interpolation="nearest", cmap=cmap, alpha=alpha,
+                    norm=LogNorm(vmin=1, vmax=max(int(grid.max()), 2)),
+                    extent=(x0 - 0.5, x0 + n_days - 0.5, edges[0], edges[-1]))
+    ax.xaxis_date()
+    ax.figure.autofmt_xdate()
+    if label is not None:
+        ax.figure.colorbar(img, ax=ax, label=f"{label} rows per cell")
+    return img
+
+
+def overlay_extrema(ax, summary: pd.DataFrame, column: str, color: str = "black"):
+    """Per-day max / min of column from the daily summary, as thin lines."""
+    lo_col, hi_col = EXTREMA[column]
+    ax.plot(summary.index, summary[hi_col], color=color, lw=0.8, label=f"daily max {column}")
+    ax.plot(summary.index, summary[lo_col], color=color, lw=0.8, ls="--", label=f"daily min {column}")
+
+
+def finish(fig, name: str, save_dir: str | None):
+    """Saves the figure as <save_dir>/<name>.png (and closes it) or shows it."""
+    if save_dir is None:
+        plt.show()
+        return
+    os.makedirs(save_dir, exist_ok=True)
+    fig.savefig(os.path.join(save_dir, f"{name}.png"), dpi=DPI, bbox_inches="tight")
+    plt.close(fig)
+
+
+def plot_all_rows(out_path: str = OUT_ALL, symbol: str | None = "SPY", save_dir: str | None = None,
+                  overlay: bool = True, y_bins: int = Y_BINS):
+    """Density versions of the plot_time_series.py all-rows scatters."""
+    summary = load_summary(out_path, "daily", symbol=symbol).set_index("date").sort_index()
+    if summary.empty:
+        print(f"No candidates in {out_path}")
+        return
+    start, end = summary.index.min(), summary.index.max()
+    columns = ["profit_sell", "profit_buy"]
+    y_range = (min(summary[EXTREMA[c][0]].min() for c in columns),
+               max(summary[EXTREMA[c][1]].max() for c in columns))
+    grids, edges = density_grid(out_path, columns, start, end, y_range, y_bins, symbol)
+
+    for c in columns:
+        fig, ax = plt.subplots()
+        draw_density(ax, grids[c], start, edges, label=c)
+        if overlay:
+            overlay_extrema(ax, summary, c)
+            ax.legend(loc="upper left")
+        ax.set_title(f"{c} over time (all rows, density)")
+        ax.set_ylabel("profit per share")
+        ax.set_xlabel("date")
+        finish(fig, f"{c}_density", save_dir)
+
+    fig, ax = plt.subplots()
+    draw_density(ax, grids["profit_sell"], start, edges, cmap="Blues")
+    draw_density(ax, grids["profit_buy"], start, edges, cmap="Oranges", alpha=0.7)
+    ax.plot([], [], color="tab:blue", lw=6, label="profit_sell")
+    ax.plot([], [], color="tab:orange", lw=6, label="profit_buy")
+    ax.set_title("profits over time (all rows, density)")
+    ax.set_ylabel("profit per share")
+    ax.set_xlabel("date")
+    ax.legend()
+    finish(fig, "profits_density", save_dir)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Density plots of every scan candidate row.")
+    ap.add_argument("csv", nargs="?", default=OUT_ALL)
+    ap.add_argument("--out", help="directory for PNGs (headless); default shows the figures")
+    ap.add_argument("--symbol", default="SPY")
+    ap.add_argument("--y-bins", type=int, default=Y_BINS)
+    ap.add_argument("--no-overlay", action="store_true")
+    args = ap.parse_args()
+
+    if args.out:
+        plt.switch_backend("Agg")
+    plot_all_rows(args.csv, args.symbol, args.out, not args.no_overlay, args.y_bins)
@@ -0,0 +1,212 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from chain_cache import load_chain
+from option_chain import LegGroups, pair_legs
+
+# ----------------------------
+# IMPLIED-VOL SURFACE
+# Black (forward) implied vol for every call and put mid of the chain at once.
+# The paired legs (option_chain.pair_legs) give each strike's call and put;
+# each expiry's forward comes from put-call parity at the strike where the
+# call and put mids are closest, so no underlying quote is needed.
+# The solver is a batched safeguarded Newton: every quote keeps a [lo, hi]
+# bracket and takes a bisection step whenever the Newton step leaves it.
+# Zero bids, deep in-the-money legs, prices outside the no-arbitrage bounds
+# and expired groups are masked (NaN).
+#   python results/implied_vol.py   -> spy_iv_surface.parquet, spy_atm_iv.parquet
+# ----------------------------
+
+PATH = "./options/spy_option_chain.csv"
+OUT_SURFACE = "spy_iv_surface.parquet"
+OUT_ATM = "spy_atm_iv.parquet"
+
+R = 0.0
+MAX_ITM = 0.05             # keep in-the-money legs only within |ln(K/F)| <= MAX_ITM
+SIGMA_BOUNDS = (1e-4, 5.0)
+PRICE_TOL = 1e-10
+MAX_ITER = 100
+ATM_DAYS = (30, 60, 90)    # constant-maturity ATM vols (ATM_IV_30d is the VIX-like one)
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal cdf via a Chebyshev erfc fit (fractional error < 1.2e-7 everywhere)."""
+    z = np.abs(x) / np.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+            -0.82215223 + t * 0.17087277))))))))
+    erfc = t * np.exp(poly)
+    return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def black_price(F, K, T, sigma, disc, is_call) -> tuple[np.ndarray, np.ndarray]:
+    """Black-76 price and vega of calls (is_call) / puts on forward F."""
+    sd = sigma * np.sqrt(T)
+    d1 = (np.log(F / K) + 0.5 * sd * sd) / sd
+    d2 = d1 - sd
+    sign = np.where(is_call, 1.0, -1.0)
+    price = disc * sign * (F * norm_cdf(sign * d1) - K * norm_cdf(sign * d2))
+    vega = disc * F * np.exp(-0.5 * d1 * d1) / np.sqrt(2 * np.pi) * np.sqrt(T)
+    return price, vega
+
+
+def implied_vol(price, F, K, T, disc, is_call, bounds=SIGMA_BOUNDS, tol: float = PRICE_TOL,
+                max_iter: int = MAX_ITER) -> np.ndarray:
+    """Black implied vol of each quote; NaN where the price has no solution in bounds.
+
+    The inputs broadcast against each other (e.g. a scalar disc for one expiry).
+    """
+    *args, is_call = np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in (price, F, K, T, disc)),
+                                         np.asarray(is_call, dtype=bool))
+    shape = is_call.shape
+    price, F, K, T, disc, is_call = (a.ravel() for a in (*args, is_call))
+    sigma = np.full(price.shape, np.nan)
+
+    # no-arbitrage bounds: intrinsic < price < disc * F (call) / disc * K (put)
+    intrinsic = disc * np.maximum(np.where(is_call, F - K, K - F), 0.0)
+    upper = disc * np.where(is_call, F, K)
+    ok = (T > 0) & (F > 0) & (K > 0) & (price > intrinsic) & (price < upper)
+    idx = np.flatnonzero(ok)
+    if not len(idx):
+        return sigma.reshape(shape)
+
+    p, f, k, t, d, c = price[idx], F[idx], K[idx], T[idx], disc[idx], is_call[idx]
+    lo = np.full(len(idx), bounds[0])
+    hi = np.full(len(idx), bounds[1])
+    # Brenner-Subrahmanyam start, ok near the money
+    s = np.clip(np.sqrt(2 * np.pi / t) * p / (d * f), lo * 2, hi / 2)
+
+    active = np.arange(len(idx))
+    for _ in range(max_iter):
+        model, vega = black_price(f[active], k[active], t[active], s[active], d[active], c[active])
+        diff = model - p[active]
+        hi[active] = np.where(diff > 0, s[active], hi[active])
+        lo[active] = np.where(diff < 0, s[active], lo[active])
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = s[active] - diff / vega
+        inside = (newton > lo[active]) & (newton < hi[active])
+        step = np.where(inside, newton, 0.5 * (lo[active] + hi[active]))
+
+        done = (np.abs(diff) <= tol * np.maximum(p[active], 1.0)) | (hi[active] - lo[active] <= 1e-12)
+        s[active] = np.where(done, s[active], step)
+        active = active[~done]
+        if not len(active):
+            break
+
+    converged = np.ones(len(idx), dtype=bool)
+    converged[active] = False
+    sigma[idx[converged]] = s[converged]
+    return sigma.reshape(shape)
+
+
+def group_forwards(legs: LegGroups, disc: np.ndarray) -> np.ndarray:
+    """Per group: K + (C_mid - P_mid) / disc at the strike with the smallest |C_mid - P_mid|."""
+    gap = (legs.call_bid + legs.call_ask - legs.put_bid - legs.put_ask) / 2
+    group = np.repeat(np.arange(legs.n_groups), np.diff(legs.offsets))
+    order = np.lexsort((np.abs(gap), group))
+    first = order[np.searchsorted(group[order], np.arange(legs.n_groups))]
+    return legs.strike[first] + gap[first] / disc
+
+
+def iv_surface(legs: LegGroups, r: float = R, max_itm: float = MAX_ITM) -> pd.DataFrame:
+    """One row per (date, act_symbol, expiration, strike) with call / put / surface vols.
+
+    iv is the out-of-the-money leg's vol (put below the forward, call above),
+    falling back to the other leg when that one is masked.
+    """
+    sizes = np.diff(legs.offsets)
+    T_g = legs.years_to_expiry()
+    disc_g = np.exp(-r * T_g)
+    fwd_g = group_forwards(legs, disc_g) if legs.n_groups else np.empty(0)
+    T, disc, F = (np.repeat(a, sizes) for a in (T_g, disc_g, fwd_g))
+    K = legs.strike
+    k = np.log(K / F)
+
+    iv = {}
+    for side, bid, ask, itm in (("call", legs.call_bid, legs.call_ask, k < -max_itm),
+                                ("put", legs.put_bid, legs.put_ask, k > max_itm)):
+        vol = implied_vol((bid + ask) / 2, F, K, T, disc, side == "call")
+        vol[(bid <= 0) | itm] = np.nan
+        iv[side] = vol
+
+    otm = np.where(k >= 0, iv["call"], iv["put"])
+    other = np.where(k >= 0, iv["put"], iv["call"])
+    g = np.repeat(np.arange(legs.n_groups), sizes)
+    return pd.DataFrame({
+        "date": legs.date[g],
+        "act_symbol": legs.act_symbol[g],
+        "expiration": legs.expiration[g],
+        "strike": K,
+        "dte": np.rint(T * 365).astype(np.int64),
+        "T_years": T,
+        "forward": F,
+        "log_moneyness": k,
+        "iv_call": iv["call"],
+        "iv_put": iv["put"],
+        "iv": np.where(np.isnan(otm), other, otm),
+    })
+
+
+def atm_term_structure(surface: pd.DataFrame) -> pd.DataFrame:
+    """ATM vol per (date, act_symbol, expiration): iv linearly interpolated to log-moneyness 0
+    between the nearest valid strikes on either side of the forward."""
+    s = surface.dropna(subset=["iv"])
+    keys = ["date", "act_symbol", "expiration"]
+    below = s[s["log_moneyness"] <= 0].sort_values("log_moneyness").groupby(keys, observed=True).tail(1)
+    above = s[s["log_moneyness"] > 0].sort_values("log_moneyness").groupby(keys, observed=True).head(1)
+    m = below.merge(above, on=keys, suffixes=("_lo", "_hi"))
+    w = -m["log_moneyness_lo"] / (m["log_moneyness_hi"] - m["log_moneyness_lo"])
+    return pd.DataFrame({
+        **{key: m[key] for key in keys},
+        "dte": m["dte_lo"],
+        "T_years": m["T_years_lo"],
+        "forward": m["forward_lo"],
+        "atm_iv": m["iv_lo"] + w * (m["iv_hi"] - m["iv_lo"]),
+    }).sort_values(keys, ignore_index=True)
+
+
+def constant_maturity(term: pd.DataFrame, days=ATM_DAYS, symbol: str | None = None) -> pd.DataFrame:
+    """Per date, ATM vol at fixed calendar maturities, linear in total variance between the
+    bracketing expiries (NaN outside the listed ones). Columns ATM_IV_<d>d, indexed by date."""
+    if symbol is not None:
+        term = term[term["act_symbol"] == symbol]
+    term = term[term["T_years"] > 0]
+    out = {}
+    for d, grp in term.groupby("date", sort=True):
+        T = grp["T_years"].to_numpy()
+        var = grp["atm_iv"].to_numpy() ** 2 * T
+        order = np.argsort(T)
+        T, var = T[order], var[order]
+        target = np.asarray(days, dtype=np.float64) / 365.0
+        v = np.interp(target, T, var, left=np.nan, right=np.nan)
+        out[d] = np.sqrt(np.maximum(v, 0.0) / target)
+    return pd.DataFrame.from_dict(out, orient="index", columns=[f"ATM_IV_{d}d" for d in days]).rename_axis("date")
+
+
+def load_legs(path: str = PATH) -> LegGroups:
+    return pair_legs(load_chain(path))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Implied-vol surface and ATM term structure of the option chain.")
+    ap.add_argument("csv", nargs="?", default=PATH)
+    ap.add_argument("--r", type=float, default=R)
+    args = ap.parse_args()
+
+    legs = load_legs(args.csv)
+    t0 = time.perf_counter()
+    surface = iv_surface(legs, args.r)
+    solved = time.perf_counter() - t0
+    term = atm_term_structure(surface)
+    cm = constant_maturity(term, symbol="SPY")
+
+    surface.to_parquet(OUT_SURFACE, index=False)
+    cm.to_parquet(OUT_ATM)
+    valid = surface[["iv_call", "iv_put"]].notna().to_numpy().sum()
+    print(f"{2 * len(surface):,} quotes, {valid:,} implied vols solved in {solved:.2f}s")
+    print(cm.tail().to_string())
@@ -0,0 +1,138 @@
+import os
+import shutil
+from dataclasses import dataclass
+
+import pandas as pd
+
+from daily_summary import LEVELS, summarize
+from scan_manifest import partition_key
+
+# ----------------------------
+# LOW-MEMORY SCAN MODE
+# For chains that do not fit comfortably in RAM (years x many symbols):
+#   - slices are held as option_chain.compact_quotes (categorical symbols,
+#     int32 strike cents, float32 quotes) until they are paired into legs
+#   - a memory budget sets the csv read chunk, the strikes per scan batch and
+#     how many batches may be in flight (plan_chunks)
+#   - every output is streamed to disk batch by batch (StreamingOutput) instead
+#     of being concatenated at the end; only the per-partition summaries, row
+#     counts and the few rows the console report prints stay in memory
+# The outputs are byte-identical to the in-memory mode.
+# ----------------------------
+
+MEMORY_BUDGET_MB = 4096
+REPORT_ROWS = 15  # rows per top list printed by the scan report
+
+# rough peak bytes, measured with pipeline_stats.StageProfiler on synthetic chains
+BYTES_PER_CSV_ROW = 600    # parsed read_csv row (object strings) incl. the pending-day copy
+BYTES_PER_STRIKE = 1_500   # one strike of a batch: compact quotes, concat, pair_legs, legs, scan output
+CSV_SHARE = 0.25           # budget fraction for csv parsing, the rest for scan batches
+MIN_BATCH_ROWS, MAX_BATCH_ROWS = 10_000, 2_000_000
+MIN_CSV_ROWS, MAX_CSV_ROWS = 50_000, 2_000_000
+
+
+@dataclass
+class ChunkPlan:
+    batch_rows: int      # strikes per LegGroups batch
+    csv_chunk_rows: int  # rows per read_csv chunk (csv input only)
+    max_in_flight: int   # batches queued on the process pool
+
+
+def plan_chunks(budget_mb: float = MEMORY_BUDGET_MB, workers: int | None = 1) -> ChunkPlan:
+    """Chunk sizes that keep the scan's peak around budget_mb.
+
+    Batches in flight are each held by the parent and pickled into a worker,
+    plus the one being built, so the batch share is split across all of them.
+    """
+    workers = workers or os.cpu_count() or 1
+    budget = budget_mb * 2**20
+    max_in_flight = 2 * workers if workers > 1 else 1
+    copies = 1 + (2 * max_in_flight if workers > 1 else max_in_flight)
+    batch_rows = int(budget * (1 - CSV_SHARE) / (BYTES_PER_STRIKE * copies))
+    csv_rows = int(budget * CSV_SHARE / BYTES_PER_CSV_ROW)
+    return ChunkPlan(
+        batch_rows=min(max(batch_rows, MIN_BATCH_ROWS), MAX_BATCH_ROWS),
+        csv_chunk_rows=min(max(csv_rows, MIN_CSV_ROWS), MAX_CSV_ROWS),
+        max_in_flight=max_in_flight,
+    )
+
+
+class StreamingOutput:
+    """One scan output written batch by batch to <path>.part.
+
+    Batches must hold whole (date, act_symbol) partitions in scan order (as
+    arbitrage_opp_update.iter_batches makes them), so per-batch summaries and
+    row counts simply add up. Keeps the top report_rows rows by each of
+    top_columns, overall and inside each (start, end) window, for the report.
+    """
+
+    def __init__(self, path: str, columns: list[str], top_columns: list[str], windows=(),
+                 summaries: bool = True, report_rows: int = REPORT_ROWS):
+        self.path = path
+        self.tmp = path + ".part"
+        self.columns = columns
+        self.top_columns = top_columns
+        self.windows = [(pd.Timestamp(s), pd.Timestamp(e)) for s, e in windows]
+        self.report_rows = report_rows
+        self.n_rows = 0
+        self.counts: dict[str, int] = {}
+        self._summaries = {level: [] for level in LEVELS} if summaries else None
+        self._top = pd.DataFrame(columns=columns)
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+    def add(self, part: pd.DataFrame):
+        if part.empty:
+            return
+        part.to_csv(self.tmp, mode="a", header=self.n_rows == 0, index=False)
+        part = part.set_axis(pd.RangeIndex(self.n_rows, self.n_rows + len(part)))
+        self.n_rows += len(part)
+
+        sizes = part.groupby(["date", "act_symbol"], sort=False).size()
+        self.counts.update({partition_key(d, sym): int(n) for (d, sym), n in sizes.items()})
+        if self._summaries is not None:
+            for level, parts in self._summaries.items():
+                parts.append(summarize(part, level))
+        self._top = self._keep_top(pd.concat([self._top, part]) if not self._top.empty else part)
+
+    def _keep_top(self, df: pd.DataFrame) -> pd.DataFrame:
+        keep = set()
+        scopes = [df] + [df[(df["date"] >= s) & (df["date"] <= e)] for s, e in self.windows]
+        for scope in scopes:
+            for col in self.top_columns:
+                keep.update(scope[col].nlargest(self.report_rows).index)
+        return df.loc[sorted(keep)]
+
+    def report_frame(self) -> pd.DataFrame:
+        """The rows any top-report_rows list of the report can print, in output order."""
+        return self._top
+
+    def summaries(self) -> dict[str, pd.DataFrame]:
+        """daily_summary.summarize of everything written, per level."""
+        empty = pd.DataFrame(columns=self.columns)
+        return {level: pd.concat(parts, ignore_index=True) if parts else summarize(empty, level)
+                for level, parts in self._summaries.items()}
+
+    def replace(self):
+        """Makes the streamed rows the whole output (just the header when there are none)."""
+        if self.n_rows:
+            os.replace(self.tmp, self.path)
+        else:
+            pd.DataFrame(columns=self.columns).to_csv(self.path, index=False)
+
+    def append(self):
+        """Appends the streamed rows (without their header) to the existing output."""
+        if self.n_rows:
+            with open(self.tmp) as src, open(self.path, "a") as dst:
+                src.readline()
+                shutil.copyfileobj(src, dst)
+        self.discard()
+
+    def read(self) -> pd.DataFrame:
+        if not self.n_rows:
+            return pd.DataFrame(columns=self.columns)
+        return pd.read_csv(self.tmp, parse_dates=["date", "expiration"], float_precision="round_trip")
+
+    def discard(self):
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# OPTION-CHAIN LOADING + PREP
+# Shared by the scan scripts. Works on any slice of the chain, so it can run
+# on the whole export or one trading day at a time.
+# ----------------------------
+
+CHAIN_COLUMNS = ["date", "act_symbol", "expiration", "strike", "call_put", "bid", "ask"]
+
+# rows parsed per read_csv chunk when streaming
+CHUNK_ROWS = 500_000
+
+
+def iter_chain_slices(path: str, chunksize: int = CHUNK_ROWS):
+    """Streams a date-ordered chain export, yielding (date, act_symbol, rows) per complete day.
+
+    Relies on the README export being ORDER BY date: a day is only emitted once a
+    later date has been seen (or the file ends), so each slice is complete.
+    """
+    pending = None
+    last_done = None
+    for chunk in pd.read_csv(path, parse_dates=["date", "expiration"], chunksize=chunksize):
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+
+        dates = chunk["date"]
+        if not dates.is_monotonic_increasing or (last_done is not None and dates.iloc[0] <= last_done):
+            raise ValueError(f"{path} must be ordered by date (see the dolt export in the README)")
+
+        done = dates < dates.iloc[-1]
+        if done.any():
+            yield from _split_symbols(chunk[done])
+            last_done = dates[done].iloc[-1]
+        pending = chunk[~done]
+
+    if pending is not None and not pending.empty:
+        yield from _split_symbols(pending)
+
+
+def _split_symbols(day_rows: pd.DataFrame):
+    for (d, sym), rows in day_rows.groupby(["date", "act_symbol"], sort=True):
+        yield d, sym, rows
+
+
+def clean_quotes(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["strike"] = pd.to_numeric(df["strike"], errors="coerce")
+    df["bid"] = pd.to_numeric(df["bid"], errors="coerce")
+    df["ask"] = pd.to_numeric(df["ask"], errors="coerce")
+
+    df = df[CHAIN_COLUMNS].dropna()
+
+    # basic quote sanity
+    return df[(df["bid"] >= 0) & (df["ask"] >= df["bid"])]
+
+
+def best_quotes(df: pd.DataFrame) -> pd.DataFrame:
+    # conservative aggregation for duplicate quotes:
+    # - best executable bid = max bid
+    # - best executable ask = min ask
+    return (
+        df.groupby(["date", "act_symbol", "expiration", "strike", "call_put"], as_index=False, observed=True)
+          .agg(bid=("bid", "max"), ask=("ask", "min"))
+    )
+
+
+def compact_quotes(agg: pd.DataFrame) -> pd.DataFrame:
+    """Low-memory copy of a cleaned slice: categorical act_symbol / call_put, strike as int32
+    cents (column strike_cents) and float32 bid / ask, each only where it converts back
+    exactly (see widen_prices); about 30 bytes per quote."""
+    out = agg[CHAIN_COLUMNS].reset_index(drop=True)
+    out["act_symbol"] = out["act_symbol"].astype("category")
+    out["call_put"] = out["call_put"].astype("category")
+    strike = out["strike"].to_numpy(dtype=np.float64)
+    cents = np.round(strike * 100)
+    if len(strike) and np.abs(cents).max() < 2**31 and np.array_equal(cents / 100, strike):
+        out.insert(out.columns.get_loc("strike"), "strike_cents", cents.astype(np.int32))
+        out = out.drop(columns="strike")
+    for col in ("bid", "ask"):
+        x = out[col].to_numpy(dtype=np.float64)
+        f32 = x.astype(np.float32)
+        if np.array_equal(widen_prices(f32), x):
+            out[col] = f32
+    return out
+
+
+def widen_prices(x: np.ndarray) -> np.ndarray:
+    """float64 quotes; float32 ones (compact_quotes) are cent prices, so they are rounded back to cents."""
+    if x.dtype == np.float32:
+        return np.round(x.astype(np.float64) * 100) / 100
+    return x.astype(np.float64, copy=False)
+
+
+def widen_quotes(df: pd.DataFrame) -> pd.DataFrame:
+    """Undoes compact_quotes' numeric columns (strike float64, bid / ask float64)."""
+    if "strike_cents" in df.columns:
+        df = df.assign(strike_cents=df["strike_cents"].to_numpy() / 100.0).rename(columns={"strike_cents": "strike"})
+    for col in ("bid", "ask"):
+        if df[col].dtype == np.float32:
+            df = df.assign(**{col: widen_prices(df[col].to_numpy())})
+    return df
+
+
+def concat_quotes(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """pd.concat of slices; if they were compacted differently they are widened first,
+    so float32 / cents columns are never upcast as raw values."""
+    layouts = {tuple(zip(f.columns, f.dtypes.astype(str))) for f in frames}
+    if len(layouts) > 1:
+        frames = [widen_quotes(f) for f in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+@dataclass
+class LegGroups:
+    """Call/put legs of many (date, act_symbol, expiration) groups stored back to back.
+
+    Group g owns rows offsets[g]:offsets[g + 1], strike-sorted; the per-group
+    keys are in date / act_symbol / expiration.
+    """
+    offsets: np.ndarray
+    date: np.ndarray
+    act_symbol: np.ndarray
+    expiration: np.ndarray
+    strike: np.ndarray
+    call_bid: np.ndarray
+    call_ask: np.ndarray
+    put_bid: np.ndarray
+    put_ask: np.ndarray
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.offsets) - 1
+
+    def years_to_expiry(self) -> np.ndarray:
+        days = (self.expiration - self.date) // np.timedelta64(1, "D")
+        return np.maximum(days / 365.0, 0.0)
+
+    def leg_block(self) -> np.ndarray:
+        """The five per-row arrays as one contiguous (5, n_rows) float64 block."""
+        return np.stack([self.strike, self.call_bid, self.call_ask, self.put_bid, self.put_ask])
+
+
+def pair_legs(agg: pd.DataFrame, max_spread_pct: float | None = None) -> LegGroups:
+    """Sort-merge join of call and put quotes per strike, straight into LegGroups.
+
+    Stands in for pivot_table(columns="call_put").dropna(): one sort by (date,
+    act_symbol, expiration, strike, call_put), then each Call row is paired with
+    the Put row right after it, so strikes missing either side drop out. With
+    max_spread_pct, strikes with a zero bid or a too-wide spread are dropped too.
+    """
+    date = agg["date"].to_numpy(dtype="datetime64[ns]")
+    sym_codes, sym_labels = pd.factorize(agg["act_symbol"], sort=True)
+    exp = agg["expiration"].to_numpy(dtype="datetime64[ns]")
+    strike = (agg["strike_cents"].to_numpy() / 100.0 if "strike_cents" in agg.columns
+              else agg["strike"].to_numpy(dtype=np.float64))
+    is_put = agg["call_put"].to_numpy(dtype=object) == "Put"  # Call sorts first
+
+    order = np.lexsort((is_put, strike, exp, sym_codes, date))
+    date, sym_codes, exp, strike, is_put = date[order], sym_codes[order], exp[order], strike[order], is_put[order]
+    bid = widen_prices(agg["bid"].to_numpy())[order]
+    ask = widen_prices(agg["ask"].to_numpy())[order]
+
+    same_strike = ((date[1:] == date[:-1]) & (sym_codes[1:] == sym_codes[:-1]) &
+                   (exp[1:] == exp[:-1]) & (strike[1:] == strike[:-1]))
+    call = np.flatnonzero(~is_put[:-1] & is_put[1:] & same_strike)
+    put = call + 1
+
+    cb, ca, pb, pa = bid[call], ask[call], bid[put], ask[put]
+    if max_spread_pct is not None:
+        # spread filter to kill most fake "arb"
+        call_spread = (ca - cb) / np.maximum(ca, 1e-9)
+        put_spread = (pa - pb) / np.maximum(pa, 1e-9)
+        keep = (cb > 0) & (pb > 0) & (call_spread <= max_spread_pct) & (put_spread <= max_spread_pct)
+        call, cb, ca, pb, pa = call[keep], cb[keep], ca[keep], pb[keep], pa[keep]
+
+    d, sc, e = date[call], sym_codes[call], exp[call]
+    starts = np.ones(len(call), dtype=bool)
+    starts[1:] = (d[1:] != d[:-1]) | (sc[1:] != sc[:-1]) | (e[1:] != e[:-1])
+    first = np.flatnonzero(starts)
+
+    return LegGroups(
+        offsets=np.append(first, len(call)),
+        date=d[first],
+        act_symbol=np.asarray(sym_labels, dtype=object)[sc[first]],
+        expiration=e[first],
+        strike=strike[call],
+        call_bid=cb,
+        call_ask=ca,
+        put_bid=pb,
+        put_ask=pa,
+    )
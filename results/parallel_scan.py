@@ -0,0 +1,59 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from arb_checks import BOX_MODE, check_groups
+from box_scan import TOP_K, scan_groups
+
+# ----------------------------
+# PROCESS-POOL SCAN
+# (date, act_symbol, expiration) groups are independent, so batches of them
+# (option_chain.LegGroups) are scanned on a pool of worker processes.
+# Each task ships only plain numpy buffers -- the (5, n_rows) leg block,
+# group offsets and years-to-expiry -- never DataFrames, and results come
+# back in submission order so the output is identical to the serial scan.
+# Extra static-arbitrage checks (arb_checks.py) run in the same task on the
+# same block, their results keyed by check name next to the scan modes.
+# ----------------------------
+
+
+def _scan_task(offsets, T, block, kwargs, checks=(), box_mode=BOX_MODE):
+    out = scan_groups(offsets, T, *block, **kwargs)
+    if checks:
+        out.update(check_groups(offsets, T, *block, checks=checks,
+                                r=kwargs.get("r", 0.0), min_profit=kwargs.get("min_profit"),
+                                box_mode=box_mode, top_k=kwargs.get("top_k", TOP_K)))
+    return out
+
+
+def scan_batches(batches, workers: int | None = 1, max_in_flight: int | None = None, checks=(),
+                 box_mode: str = BOX_MODE, **scan_kwargs):
+    """Yields (legs, pairs) for each LegGroups batch, in input order.
+
+    workers=1 scans in-process; None uses every core. At most max_in_flight
+    batches (default 2 per worker) are queued at once to bound memory.
+    checks adds arb_checks results to pairs under the check names; the "box"
+    check runs box_scan mode box_mode with the scan's r, min_profit and top_k.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1:
+        for legs in batches:
+            yield legs, _scan_task(legs.offsets, legs.years_to_expiry(), legs.leg_block(), scan_kwargs,
+                                   checks, box_mode)
+        return
+
+    max_in_flight = max_in_flight or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for legs in batches:
+            fut = pool.submit(_scan_task, legs.offsets, legs.years_to_expiry(), legs.leg_block(), scan_kwargs,
+                              checks, box_mode)
+            pending.append((legs, fut))
+            if len(pending) >= max_in_flight:
+                done_legs, done = pending.popleft()
+                yield done_legs, done.result()
+        while pending:
+            done_legs, done = pending.popleft()
+            yield done_legs, done.result()
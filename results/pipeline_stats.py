@@ -0,0 +1,206 @@
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource  # unix only
+except ImportError:
+    resource = None
+
+# ----------------------------
+# PIPELINE INSTRUMENTATION
+# Per-stage wall time, rows in/out, rows/s, peak RSS and tracemalloc peak,
+# plus free-form counters, written as one json report.
+#   prof = StageProfiler()
+#   with prof.stage("clean", rows_in=len(raw)) as st:
+#       clean = clean_quotes(raw)
+#       st.rows_out = len(clean)
+#   for item in prof.iterate("read_csv", reader, rows_out=len): ...
+# A stage entered many times (once per day / batch) accumulates. Stages may
+# nest (generators pulled inside another stage); self_s excludes the time
+# spent in nested stages, wall_s includes it.
+# NULL_PROFILER has the same API and does nothing, so disabled runs pay one
+# method call per stage.
+# ----------------------------
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process so far (MB), None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KB elsewhere
+
+
+class _Stage:
+    __slots__ = ("name", "rows_in", "rows_out", "t0", "child_s", "mem_peak")
+
+    def __init__(self, name, rows_in):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.child_s = 0.0
+        self.mem_peak = 0
+
+
+class _NullStage:
+    __slots__ = ("rows_in", "rows_out")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class NullProfiler:
+    """Disabled profiler: same API as StageProfiler, records nothing."""
+    enabled = False
+
+    def __init__(self):
+        self._stage = _NullStage()
+
+    def stage(self, name: str, rows_in: int | None = None):
+        return self._stage
+
+    def iterate(self, name: str, iterable, rows_in=None, rows_out=None):
+        return iterable
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def report(self) -> dict:
+        return {}
+
+    def write(self, path: str, **extra):
+        pass
+
+    def stop(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class StageProfiler:
+    enabled = True
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stats: dict[str, dict] = {}
+        self.counters: dict[str, int] = {}
+        self._stack: list[_Stage] = []
+        self._started = datetime.now()
+        self._t0 = time.perf_counter()
+        self._own_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self._own_tracing:
+            tracemalloc.start()
+
+    def stage(self, name: str, rows_in: int | None = None):
+        return _StageContext(self, name, rows_in)
+
+    def iterate(self, name: str, iterable, rows_in=None, rows_out=None):
+        """Yields from iterable, timing each next() as one entry of stage `name`.
+
+        rows_in / rows_out are optional functions of the yielded item.
+        """
+        it = iter(iterable)
+        while True:
+            st = self._enter(name, None)
+            try:
+                item = next(it)
+            except StopIteration:
+                self._exit(st, record=False)
+                return
+            except BaseException:
+                self._exit(st)
+                raise
+            if rows_in is not None:
+                st.rows_in = rows_in(item)
+            if rows_out is not None:
+                st.rows_out = rows_out(item)
+            self._exit(st)
+            yield item
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def _enter(self, name, rows_in) -> _Stage:
+        st = _Stage(name, rows_in)
+        if self.trace_memory:
+            if self._stack:
+                # fold the parent's peak so far in before resetting it for the child
+                parent = self._stack[-1]
+                parent.mem_peak = max(parent.mem_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self._stack.append(st)
+        st.t0 = time.perf_counter()
+        return st
+
+    def _exit(self, st: _Stage, record: bool = True):
+        elapsed = time.perf_counter() - st.t0
+        self._stack.pop()
+        mem_peak = max(st.mem_peak, tracemalloc.get_traced_memory()[1]) if self.trace_memory else 0
+        if self._stack:
+            parent = self._stack[-1]
+            parent.child_s += elapsed
+            parent.mem_peak = max(parent.mem_peak, mem_peak)
+        if not record:
+            return
+
+        s = self.stats.get(st.name)
+        if s is None:
+            s = self.stats[st.name] = {"calls": 0, "wall_s": 0.0, "self_s": 0.0, "rows_in": 0, "rows_out": 0,
+                                        "tracemalloc_peak_mb": None, "peak_rss_mb": None}
+        s["calls"] += 1
+        s["wall_s"] += elapsed
+        s["self_s"] += elapsed - st.child_s
+        s["rows_in"] += st.rows_in or 0
+        s["rows_out"] += st.rows_out or 0
+        if self.trace_memory:
+            s["tracemalloc_peak_mb"] = max(s["tracemalloc_peak_mb"] or 0.0, mem_peak / 2**20)
+        s["peak_rss_mb"] = peak_rss_mb()
+
+    def report(self) -> dict:
+        stages = {}
+        for name, s in self.stats.items():
+            rows = s["rows_in"] or s["rows_out"]
+            stages[name] = {**s, "rows_per_s": rows / s["self_s"] if rows and s["self_s"] > 0 else None}
+        return {
+            "started": self._started.isoformat(timespec="seconds"),
+            "total_wall_s": time.perf_counter() - self._t0,
+            "peak_rss_mb": peak_rss_mb(),
+            "tracemalloc": self.trace_memory,
+            "stages": stages,
+            "counters": dict(self.counters),
+        }
+
+    def write(self, path: str, **extra):
+        """Writes report() (plus any extra top-level fields, e.g. the run config) as json."""
+        with open(path, "w") as f:
+            json.dump({**extra, **self.report()}, f, indent=1)
+
+    def stop(self):
+        """Stops tracemalloc if this profiler started it."""
+        if self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
+
+
+class _StageContext:
+    __slots__ = ("prof", "name", "rows_in", "st")
+
+    def __init__(self, prof, name, rows_in):
+        self.prof = prof
+        self.name = name
+        self.rows_in = rows_in
+
+    def __enter__(self) -> _Stage:
+        self.st = self.prof._enter(self.name, self.rows_in)
+        return self.st
+
+    def __exit__(self, *exc):
+        self.prof._exit(self.st)
+        return False
@@ -1,11 +1,13 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
-res = pd.read_csv("spy_box_arbitrage_allpairs.csv", parse_dates=["date","expiration"])
+from daily_summary import load_summary
 
-daily = (res.assign(best=res[["profit_buy","profit_sell"]].max(axis=1))
-           .groupby("date")["best"].max()
-           .sort_index())
+OUT_ALL = "spy_box_arbitrage_allpairs.csv"
+
+# daily stats come from the summary the scan writes next to the csv (daily_summary.py)
+summary = load_summary(OUT_ALL, "daily", symbol="SPY").set_index("date").sort_index()
+daily = summary["best_profit"]
 
 plt.figure()
 daily.plot()
@@ -21,6 +23,8 @@ plt.ylabel("max profit (per share)")
 plt.show()
 
 
+# the histograms need every row, but only these columns
+res = pd.read_csv(OUT_ALL, usecols=["date", "profit_buy", "profit_sell"], parse_dates=["date"])
 
 plt.figure()
 res["profit_sell"].hist(bins=60)
@@ -33,15 +37,13 @@ plt.title("Distribution of profit_sell (COVID window)")
 plt.show()
 
 
-res = pd.read_csv("spy_box_arbitrage_allpairs.csv", parse_dates=["date","expiration"])
-
 plt.figure()
 res["profit_buy"].hist(bins=60)
 plt.title("Distribution of profit_buy (candidates rows)")
 plt.show()
 
-daily_min_buy = res.groupby("date")["profit_buy"].min().sort_index()
+daily_min_buy = summary["buy_min"]
 plt.figure()
 daily_min_buy.plot()
 plt.title("Daily min profit_buy (candidates rows)")
-plt.show()
\ No newline at end of file
+plt.show()
@@ -1,68 +1,66 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
-res = pd.read_csv("spy_box_arbitrage_allpairs.csv", parse_dates=["date","expiration"])
+from daily_summary import load_summary
+from density_plot import finish, plot_all_rows
 
-print("profit_sell min/max:", res["profit_sell"].min(), res["profit_sell"].max())
-print("profit_buy  min/max:", res["profit_buy"].min(),  res["profit_buy"].max())
+OUT_ALL = "spy_box_arbitrage_allpairs.csv"
 
-g = res.groupby("date")
+# all-rows plots: "density" bins every row into a date x profit image read in chunks
+# (density_plot.py), "points" draws one scatter marker per row (small outputs only)
+SCATTER_MODE = "density"
+SAVE_DIR = None  # e.g. "reports": write PNGs there instead of opening windows (headless)
 
-ts = pd.DataFrame({
-    "sell_max": g["profit_sell"].max(),
-    "sell_med": g["profit_sell"].median(),
-    "sell_min": g["profit_sell"].min(),
-    "buy_max":  g["profit_buy"].max(),
-    "buy_med":  g["profit_buy"].median(),
-    "buy_min":  g["profit_buy"].min(),
-}).sort_index()
+if SAVE_DIR is not None:
+    plt.switch_backend("Agg")
 
-plt.figure()
-ts[["sell_max","sell_med","sell_min"]].plot()
-plt.title("profit_sell time series (dataset)")
-plt.ylabel("profit per share")
-plt.show()
-
-plt.figure()
-ts[["buy_max","buy_med","buy_min"]].plot()
-plt.title("profit_buy time series (dataset)")
-plt.ylabel("profit per share")
-plt.show()
-
-
-
-import pandas as pd
-import matplotlib.pyplot as plt
+# daily stats come from the summary the scan writes next to the csv (daily_summary.py)
+ts = load_summary(OUT_ALL, "daily", symbol="SPY").set_index("date").sort_index()
 
-res = pd.read_csv("spy_box_arbitrage_allpairs.csv", parse_dates=["date","expiration"])
-res = res.sort_values("date")
+print("profit_sell min/max:", ts["sell_min"].min(), ts["sell_max"].max())
+print("profit_buy  min/max:", ts["buy_min"].min(),  ts["buy_max"].max())
 
-plt.figure()
-plt.scatter(res["date"], res["profit_sell"], s=6)
-plt.title("profit_sell over time (all rows)")
-plt.ylabel("profit per share")
-plt.xlabel("date")
-plt.show()
-
-plt.figure()
-plt.scatter(res["date"], res["profit_buy"], s=6)
-plt.title("profit_buy over time (all rows)")
+fig = plt.figure()
+ts[["sell_max","sell_med","sell_min"]].plot(ax=fig.gca())
+plt.title("profit_sell time series (dataset)")
 plt.ylabel("profit per share")
-plt.xlabel("date")
-plt.show()
+finish(fig, "profit_sell_daily", SAVE_DIR)
 
-
-import pandas as pd
-import matplotlib.pyplot as plt
-
-res = pd.read_csv("spy_box_arbitrage_allpairs.csv", parse_dates=["date","expiration"])
-res = res.sort_values("date")
-
-plt.figure()
-plt.scatter(res["date"], res["profit_sell"], s=6, label="profit_sell")
-plt.scatter(res["date"], res["profit_buy"],  s=6, label="profit_buy")
-plt.title("profits over time (all rows)")
+fig = plt.figure()
+ts[["buy_max","buy_med","buy_min"]].plot(ax=fig.gca())
+plt.title("profit_buy time series (dataset)")
 plt.ylabel("profit per share")
-plt.xlabel("date")
-plt.legend()
-plt.show()
+finish(fig, "profit_buy_daily", SAVE_DIR)
+
+
+
+if SCATTER_MODE == "density":
+    plot_all_rows(OUT_ALL, symbol="SPY", save_dir=SAVE_DIR)
+else:
+    # the scatters need every row, but only these columns (read once)
+    res = pd.read_csv(OUT_ALL, usecols=["date", "profit_buy", "profit_sell"], parse_dates=["date"])
+    res = res.sort_values("date")
+
+    fig = plt.figure()
+    plt.scatter(res["date"], res["profit_sell"], s=6)
+    plt.title("profit_sell over time (all rows)")
+    plt.ylabel("profit per share")
+    plt.xlabel("date")
+    finish(fig, "profit_sell_scatter", SAVE_DIR)
+
+    fig = plt.figure()
+    plt.scatter(res["date"], res["profit_buy"], s=6)
+    plt.title("profit_buy over time (all rows)")
+    plt.ylabel("profit per share")
+    plt.xlabel("date")
+    finish(fig, "profit_buy_scatter", SAVE_DIR)
+
+
+    fig = plt.figure()
+    plt.scatter(res["date"], res["profit_sell"], s=6, label="profit_sell")
+    plt.scatter(res["date"], res["profit_buy"],  s=6, label="profit_buy")
+    plt.title("profits over time (all rows)")
+    plt.ylabel("profit per share")
+    plt.xlabel("date")
+    plt.legend()
+    finish(fig, "profits_scatter", SAVE_DIR)
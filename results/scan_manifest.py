@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# ----------------------------
+# INCREMENTAL SCAN MANIFEST
+# Remembers which (date, act_symbol) partitions the output files already hold,
+# a digest of the cleaned quotes each was scanned from, the rows it contributed
+# to each output, and the config used.
+#   {"config": {...},
+#    "partitions": {"2020-01-02|SPY": [digest, {"spy_box_arbitrage_allpairs.csv": n_rows, ...}], ...}}
+# A config change (or a missing output that should hold rows) forces a full rebuild.
+# ----------------------------
+
+
+EMPTY_DIGEST = hashlib.sha1().hexdigest()  # quotes_digest of a slice with no quotes
+
+
+def partition_key(d, sym) -> str:
+    return f"{pd.Timestamp(d):%Y-%m-%d}|{sym}"
+
+
+def split_key(key: str):
+    d, sym = key.split("|", 1)
+    return pd.Timestamp(d), sym
+
+
+def quotes_digest(agg: pd.DataFrame) -> str:
+    """Digest of one cleaned (date, act_symbol) slice, independent of dtypes/source."""
+    h = hashlib.sha1()
+    h.update(agg["expiration"].to_numpy(dtype="datetime64[D]").tobytes())
+    for col in ("strike", "bid", "ask"):
+        h.update(agg[col].to_numpy(dtype=np.float64).tobytes())
+    h.update("\0".join(agg["call_put"].astype(str)).encode())
+    return h.hexdigest()
+
+
+class ScanManifest:
+    def __init__(self, path: str, config: dict, out_paths: list[str]):
+        self.path = path
+        self.config = config
+        self.partitions: dict[str, list] = {}
+        self.seen: dict[str, str] = {}
+        self.scanned: set[str] = set()
+
+        old = None
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                old = json.load(f)
+
+        def lost_rows(out_path):
+            return not os.path.exists(out_path) and any(
+                counts.get(out_path, 0) for _, counts in old["partitions"].values())
+
+        self.rebuild = (
+            old is None
+            or old["config"] != config
+            or any(lost_rows(o) for o in out_paths)
+        )
+        if not self.rebuild:
+            self.partitions = {k: list(v) for k, v in old["partitions"].items()}
+
+    def needs_scan(self, d, sym, agg: pd.DataFrame) -> bool:
+        """Records the slice as seen; True if it is new or its quotes changed."""
+        key = partition_key(d, sym)
+        digest = quotes_digest(agg)
+        self.seen[key] = digest
+        if self.partitions.get(key, [None])[0] == digest:
+            return False
+        self.scanned.add(key)
+        return True
+
+    def stale_keys(self) -> set[str]:
+        """Partitions already in the output whose rows must be dropped (changed or gone)."""
+        return {k for k, (digest, _) in self.partitions.items() if self.seen.get(k) != digest}
+
+    def appends_only(self) -> bool:
+        """True if every newly scanned partition sorts after everything already written."""
+        if self.stale_keys():
+            return False
+        new = [split_key(k) for k in self.seen if k not in self.partitions]
+        if not new or not self.partitions:
+            return True
+        return min(new) > max(split_key(k) for k in self.partitions)
+
+    def commit(self, row_counts: dict[str, dict[str, int]]):
+        """Saves the manifest once the outputs have been written.
+
+        row_counts maps out_path -> {partition key: rows written} for the scanned partitions.
+        """
+        partitions = {k: v for k, v in self.partitions.items() if k in self.seen}
+        for key, digest in self.seen.items():
+            if key not in partitions or partitions[key][0] != digest:
+                partitions[key] = [digest, {o: int(c.get(key, 0)) for o, c in row_counts.items()}]
+        self.partitions = partitions
+
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"config": self.config, "partitions": partitions}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
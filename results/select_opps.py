@@ -1,6 +1,8 @@
 import pandas as pd
 
-df = pd.read_csv("spy_arbitrage_opportunities.csv", parse_dates=["date","expiration"])
+# needs individual rows (the top pairs), not the daily summaries, so only read the columns shown
+df = pd.read_csv("spy_arbitrage_opportunities.csv", parse_dates=["date","expiration"],
+                 usecols=["date","expiration","K1","K2","cost_buy","profit_buy","proceeds_sell","profit_sell"])
 
 # keep only meaningful positives (tune threshold if needed)
 df_buy  = df[df["profit_buy"]  > 0.05].sort_values("profit_buy", ascending=False)
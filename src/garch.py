@@ -0,0 +1,371 @@
+import hashlib
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Rolling GARCH(1,1) on zero-mean daily log returns r_t:
+#   h_t = omega + alpha * r_{t-1}^2 + beta * h_{t-1}
+# fitted by Gaussian maximum likelihood on every window that ends on a
+# trading day. Each fit works on the window's squared returns scaled by their
+# mean (h_0 = 1); the variance recursion and its first and second derivatives
+# are computed in closed form with geometric_filter, and the steps are Newton
+# steps on the analytic Hessian with backtracking, taken in box-constrained
+# coordinates (log omega, logit persistence, logit alpha share). Consecutive
+# windows share all but one day, so each refit starts from the previous
+# window's parameters; interior fits then converge in a handful of steps. On
+# heavy-tailed returns the likelihood is often flat or multimodal towards
+# alpha = 0 and a warm start can stop on an edge or fail, so such a fit is
+# redone from the best point of a coarse grid. Windows still not converged
+# are kept with converged = False and get no volatility in garch_vol.
+
+ANN_DAYS = 252
+THETA0 = (0.05, 0.05, 0.90)   # default start: omega / window mean square, alpha, beta
+GRID_PERSISTENCE = (0.0, 0.5, 0.9, 0.97, 0.99, 0.999)
+GRID_ALPHA_SHARE = (0.0, 0.02, 0.05, 0.1, 0.2)   # cold starts: omega = 1 - persistence (h = 1)
+TOL = 1e-9                    # Newton decrement at convergence
+FTOL = 1e-10                  # ... or a step that changes the loglik by at most this (relative)
+XTOL = 1e-8                   # ... or the free coordinates by at most this
+MAX_ITER = 200
+MAX_PERSISTENCE = 1 - 1e-6    # alpha + beta cap (covariance stationarity)
+MIN_OMEGA = 1e-12             # in units of the window mean square
+MAX_LOGIT = 20.0              # |logit| bound of the persistence and the alpha share
+FREE_LO = np.array([math.log(MIN_OMEGA), -MAX_LOGIT, -MAX_LOGIT])
+FREE_HI = np.array([np.inf, MAX_LOGIT, MAX_LOGIT])
+MAX_STEP = 5.0                # largest step in any free coordinate
+MIN_LAMBDA = 1e-4             # smallest backtracking step fraction
+MAX_EXP = 300.0               # largest log(beta^-k) inside one geometric_filter block
+BLOCK = 250                   # window ends per task; each block is fitted from a cold start
+
+PARAM_COLUMNS = ["omega", "alpha", "beta", "var_next", "loglik", "n_iter", "converged", "digest"]
+
+
+def geometric_filter(x: np.ndarray, beta: float, y0=0.0) -> np.ndarray:
+    """y_t = x_t + beta * y_{t-1} along axis 0, with y_{-1} = y0 (x is (n,) or (n, k)).
+
+    Per block y_{s+k} = beta^k * (cumsum_j x_{s+j} beta^-j + beta * y_{s-1}); blocks
+    are cut so beta^-k stays finite (one block for any beta near GARCH values).
+    Exact up to rounding for non-negative inputs, as all of them are here.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if beta <= 0.0 or n == 0:
+        return x.copy()
+    log_b = math.log(beta)
+    block = n if log_b == 0.0 else max(1, min(n, int(MAX_EXP / -log_b)))
+    shape = (-1,) + (1,) * (x.ndim - 1)
+    out = np.empty_like(x)
+    prev = np.asarray(y0, dtype=np.float64)
+    for s in range(0, n, block):
+        k = np.arange(min(block, n - s), dtype=np.float64).reshape(shape)
+        pw = np.exp(k * log_b)
+        y = pw * (np.cumsum(x[s:s + block] / pw, axis=0) + beta * prev)
+        out[s:s + block] = y
+        prev = y[-1]
+    return out
+
+
+def _to_free(theta) -> np.ndarray:
+    """(omega, alpha, beta) -> free coordinates (log omega, logit persistence / MAX_PERSISTENCE,
+    logit alpha share), clipped into FREE_LO / FREE_HI."""
+    w, a, b = theta
+    p = min(max(a + b, 1e-12), MAX_PERSISTENCE * (1 - 1e-12))
+    share = min(max(a / (a + b) if a + b > 0 else 0.5, 1e-12), 1 - 1e-12)
+    q = p / MAX_PERSISTENCE
+    u = np.array([math.log(max(w, MIN_OMEGA)), math.log(q / (1 - q)), math.log(share / (1 - share))])
+    return np.clip(u, FREE_LO, FREE_HI)
+
+
+def _from_free(u) -> tuple[np.ndarray, np.ndarray]:
+    """Parameters and the Jacobian d theta / d u."""
+    q = 1 / (1 + math.exp(-u[1]))
+    share = 1 / (1 + math.exp(-u[2]))
+    w, p = math.exp(u[0]), MAX_PERSISTENCE * q
+    dp, ds = p * (1 - q), share * (1 - share)
+    jac = np.array([[w, 0.0, 0.0],
+                    [0.0, share * dp, p * ds],
+                    [0.0, (1 - share) * dp, -p * ds]])
+    return np.array([w, share * p, (1 - share) * p]), jac
+
+
+def garch_loglik(theta, z: np.ndarray):
+    """Loglik, gradient, Hessian, expected information and variances of normalized squared returns z.
+
+    h_0 = 1 (the window mean square); the first and second derivatives of h
+    follow their own recursions with the same beta, so all of them are
+    geometric filters.
+    """
+    w, a, b = theta
+    n = len(z)
+    x = np.empty((n - 1, 3))
+    x[:, 0] = w + a * z[:-1]   # h
+    x[:, 1] = 1.0              # dh / d omega
+    x[:, 2] = z[:-1]           # dh / d alpha
+    f = geometric_filter(x, b, np.array([1.0, 0.0, 0.0]))
+    h = np.concatenate([[1.0], f[:, 0]])
+    dh = np.zeros((n, 3))
+    dh[1:, :2] = f[:, 1:]
+    dh[1:, 2] = geometric_filter(h[:-1], b)  # dh / d beta
+    d2h = np.zeros((n, 3))                   # d2h / d beta d (omega, alpha, beta)
+    d2h[1:] = geometric_filter(dh[:-1] * [1.0, 1.0, 2.0], b)
+    ll = -0.5 * (n * math.log(2 * math.pi) + np.sum(np.log(h) + z / h))
+    dlh = dh / h[:, None]
+    e = z / h - 1.0
+    info = 0.5 * dlh.T @ dlh
+    hess = -info - (e[:, None] * dlh).T @ dlh
+    hess[2] += 0.5 * (e / h) @ d2h
+    hess[:2, 2] = hess[2, :2]
+    return ll, 0.5 * e @ dlh, hess, info, h
+
+
+def _free_curvature(u, theta, jac, g, hess, info):
+    """Hessian and expected information of the loglik in the free coordinates u."""
+    q, share = 1 / (1 + math.exp(-u[1])), 1 / (1 + math.exp(-u[2]))
+    p = theta[1] + theta[2]
+    dp, ds = p * (1 - q), share * (1 - share)
+    curve = np.zeros((3, 3))   # sum_k g_k d2 theta_k / du2
+    curve[0, 0] = g[0] * theta[0]
+    curve[1, 1] = (g[1] * share + g[2] * (1 - share)) * dp * (1 - 2 * q)
+    curve[1, 2] = curve[2, 1] = (g[1] - g[2]) * ds * dp
+    curve[2, 2] = (g[1] - g[2]) * p * ds * (1 - 2 * share)
+    return jac.T @ hess @ jac + curve, jac.T @ info @ jac
+
+
+def _box_step(u, g, hess, info):
+    """Newton step in the free coordinates u that stays inside FREE_LO / FREE_HI.
+
+    Coordinates on a bound with the gradient pointing out are held; one whose
+    step would cross a bound is moved onto it and the others re-solved, so the
+    whole step is feasible and (for a negative definite block) an ascent
+    direction. Scoring on the expected information replaces the Hessian where
+    that is not negative definite. None if neither can be factored.
+    """
+    held = ((u <= FREE_LO) & (g < 0)) | ((u >= FREE_HI) & (g > 0))
+    step = np.zeros(3)
+    for _ in range(3):
+        free = ~held
+        if not free.any():
+            break
+        sub, rest = np.ix_(free, free), np.ix_(free, held)
+        for H in (-hess, info):
+            try:
+                c = np.linalg.cholesky(H[sub] + 1e-12 * np.trace(H[sub]) * np.eye(free.sum()))
+            except np.linalg.LinAlgError:
+                continue
+            step[free] = np.linalg.solve(c.T, np.linalg.solve(c, g[free] - H[rest] @ step[held]))
+            break
+        else:
+            return None
+        out = np.clip(u + step, FREE_LO, FREE_HI)
+        cross = free & (out != u + step)
+        if not cross.any():
+            break
+        step[cross] = out[cross] - u[cross]
+        held |= cross
+    return step
+
+
+def fit_garch(z: np.ndarray, theta0=THETA0, tol: float = TOL, max_iter: int = MAX_ITER,
+              ftol: float = FTOL, xtol: float = XTOL):
+    """ML fit on normalized squared returns z; returns (theta, loglik, h, n_iter, converged, at_bound).
+
+    Backtracking along the boxed steps of _box_step, so a fit heading for
+    alpha = 0, beta = 0 or alpha + beta = 1 stops on that edge (at_bound)
+    instead of crawling towards it. converged: the Newton decrement fell below
+    tol, or a step changed the loglik by at most ftol (relative) or the free
+    coordinates by at most xtol; False when max_iter ran out or no step
+    raised the loglik.
+    """
+    def evaluate(u):
+        theta, jac = _from_free(u)
+        ll, g, hess, info, h = garch_loglik(theta, z)
+        return ll, g @ jac, _free_curvature(u, theta, jac, g, hess, info), h
+
+    u = _to_free(theta0)
+    ll, g, curv, h = evaluate(u)
+    converged = False
+    it = 0
+    while it < max_iter:
+        it += 1
+        step = _box_step(u, g, *curv)
+        if step is None:
+            break
+        if g @ step < tol:
+            converged = True
+            break
+        lam = min(1.0, MAX_STEP / np.abs(step).max())
+        while True:
+            cand = np.clip(u + lam * step, FREE_LO, FREE_HI)
+            new = evaluate(cand)
+            if new[0] >= ll or lam < MIN_LAMBDA:
+                break
+            lam *= 0.5
+        if new[0] < ll:
+            break
+        stalled = new[0] - ll <= ftol * (1 + abs(ll)) or np.abs(cand - u).max() <= xtol
+        u, (ll, g, curv, h) = cand, new
+        if stalled:
+            converged = True
+            break
+    at_bound = bool(((u <= FREE_LO) | (u >= FREE_HI)).any())
+    return _from_free(u)[0], ll, h, it, converged, at_bound
+
+
+def grid_start(z: np.ndarray) -> tuple:
+    """The GRID_PERSISTENCE x GRID_ALPHA_SHARE point with the highest loglik on z."""
+    best, best_ll = None, -np.inf
+    for p in GRID_PERSISTENCE:
+        for share in GRID_ALPHA_SHARE:
+            w, a, b = 1 - p, share * p, (1 - share) * p
+            h = np.concatenate([[1.0], geometric_filter(w + a * z[:-1], b, 1.0)])
+            ll = -np.sum(np.log(h) + z / h)
+            if ll > best_ll:
+                best, best_ll = (w, a, b), ll
+    return best
+
+
+def fit_settings(tol: float = TOL) -> str:
+    """Everything a cached fit depends on besides its returns."""
+    return repr((tol, FTOL, XTOL, MAX_ITER, MAX_PERSISTENCE, MIN_OMEGA, MAX_LOGIT, MAX_STEP,
+                 MIN_LAMBDA, GRID_PERSISTENCE, GRID_ALPHA_SHARE, BLOCK))
+
+
+def window_digest(r: np.ndarray, settings: str = "") -> str:
+    h = hashlib.sha1(np.ascontiguousarray(r, dtype=np.float64).tobytes())
+    h.update(settings.encode())
+    return h.hexdigest()[:16]
+
+
+def rolling_garch(returns: np.ndarray, window: int, ends, theta0=None, tol: float = TOL,
+                  max_iter: int = MAX_ITER) -> pd.DataFrame:
+    """Fits returns[e - window + 1 : e + 1] for each end index e, in order.
+
+    Each fit starts from the previous one's (omega, alpha, beta), the first from
+    theta0 or, if None, from grid_start. A warm fit that does not converge or
+    ends on an edge of the parameter box is redone from grid_start and the
+    better of the two kept (converged first, then loglik); n_iter counts both.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    r2 = returns * returns
+    settings = fit_settings(tol)
+    rows = []
+    prev = theta0
+    for e in ends:
+        z = r2[e - window + 1:e + 1]
+        scale = z.mean()
+        z = z / scale
+        fit, n_iter = None, 0
+        if prev is not None and scale > 0:
+            fit = fit_garch(z, (prev[0] / scale, prev[1], prev[2]), tol, max_iter)
+            n_iter = fit[3]
+        if fit is None or not fit[4] or fit[5]:
+            cold = fit_garch(z, grid_start(z), tol, max_iter)
+            n_iter += cold[3]
+            if fit is None or (cold[4], cold[1]) >= (fit[4], fit[1]):
+                fit = cold
+        (w, a, b), ll, h, _, ok, _ = fit
+        rows.append((w * scale, a, b, (w + a * z[-1] + b * h[-1]) * scale,
+                     ll - 0.5 * window * math.log(scale), n_iter, ok,
+                     window_digest(returns[e - window + 1:e + 1], settings)))
+        prev = (w * scale, a, b)
+    return pd.DataFrame(rows, columns=PARAM_COLUMNS, index=np.asarray(ends, dtype=np.int64))
+
+
+def _cache_path(cache_dir, ticker: str, window: int) -> Path:
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+    return Path(cache_dir) / f"{name}.garch{window}.parquet"
+
+
+def garch_backtest(returns: dict[str, pd.Series], window: int, workers: int | None = 1,
+                   cache_dir: str | Path | None = None, tol: float = TOL) -> dict[str, pd.DataFrame]:
+    """Daily-refit rolling GARCH(1,1) for each ticker's return series (NaNs dropped).
+
+    Returns {ticker: frame indexed by window end date} with PARAM_COLUMNS;
+    var_next is the one-day-ahead variance forecast made at that date. The
+    window ends are cut into fixed blocks of BLOCK, each fitted from a cold
+    start and warm within, so the fits do not depend on workers (> 1 fits the
+    blocks in parallel, None = all cores). With cache_dir, fits are stored per
+    (ticker, window) and keyed by a digest of each window's returns and the fit
+    settings; a block is refit from its first new or changed end onwards,
+    starting from the cached fit before it.
+    """
+    settings = fit_settings(tol)
+    series, cached, tasks = {}, {}, []
+    for ticker, s in returns.items():
+        s = s.dropna()
+        r = s.to_numpy(dtype=np.float64)
+        series[ticker] = (s.index, r)
+        ends = np.arange(window - 1, len(r))
+        digests = [window_digest(r[e - window + 1:e + 1], settings) for e in ends]
+
+        old = None
+        if cache_dir is not None and _cache_path(cache_dir, ticker, window).exists():
+            old = pd.read_parquet(_cache_path(cache_dir, ticker, window))
+        if old is not None and not old.empty:
+            pos = s.index.get_indexer(old.index)
+            hit = pos >= window - 1
+            hit[hit] = old["digest"].to_numpy()[hit] == np.asarray(digests, dtype=object)[pos[hit] - (window - 1)]
+            old = old[hit].set_axis(pos[hit])
+        else:
+            old = pd.DataFrame(columns=PARAM_COLUMNS)
+
+        done = np.isin(ends, old.index.to_numpy())
+        for k in range(0, len(ends), BLOCK):
+            missing = np.flatnonzero(~done[k:k + BLOCK])
+            if not len(missing):
+                continue
+            chunk = ends[k + missing[0]:k + BLOCK]
+            theta0 = tuple(old.loc[chunk[0] - 1, ["omega", "alpha", "beta"]]) if missing[0] else None
+            old = old.drop(chunk, errors="ignore")
+            tasks.append((ticker, chunk, theta0))
+        cached[ticker] = old
+
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(rolling_garch, series[t][1], window, chunk, theta0, tol)
+                       for t, chunk, theta0 in tasks]
+            fits = [f.result() for f in futures]
+    else:
+        fits = [rolling_garch(series[t][1], window, chunk, theta0, tol) for t, chunk, theta0 in tasks]
+
+    out = {}
+    for ticker, (index, _) in series.items():
+        parts = [cached[ticker]] + [f for (t, _, _), f in zip(tasks, fits) if t == ticker]
+        parts = [p for p in parts if not p.empty]
+        if parts:
+            df = pd.concat(parts).sort_index()
+            df = df.set_axis(index[df.index.to_numpy(dtype=np.int64)])
+        else:
+            df = pd.DataFrame(columns=PARAM_COLUMNS, index=index[:0])
+        df = df.astype({"n_iter": np.int64, "converged": bool})
+        if cache_dir is not None:
+            path = _cache_path(cache_dir, ticker, window)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(path)
+        out[ticker] = df
+    return out
+
+
+def garch_vol(params: pd.DataFrame, horizon: int = 1, ann_days: int = ANN_DAYS) -> pd.Series:
+    """Annualized vol forecast at each window end: mean GARCH variance over the next horizon days.
+
+    NaN where the fit did not converge.
+    """
+    v1 = params["var_next"].astype(np.float64).where(params["converged"].astype(bool))
+    if horizon > 1:
+        p = (params["alpha"] + params["beta"]).astype(np.float64)
+        v_long = params["omega"] / (1 - p)
+        v1 = v_long + (v1 - v_long) * (1 - p ** horizon) / (horizon * (1 - p))
+    return np.sqrt(v1 * ann_days)
+
+
+def report_unconverged(params: dict[str, pd.DataFrame]):
+    """Prints how many window fits per ticker did not converge (garch_vol leaves them NaN)."""
+    for ticker, df in params.items():
+        bad = int((~df["converged"].astype(bool)).sum())
+        if bad:
+            print(f"GARCH {ticker}: {bad} of {len(df)} window fits did not converge; "
+                  f"their volatility is left NaN")
@@ -0,0 +1,179 @@
+import io
+import json
+import re
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import yfinance as yf
+
+MAX_FETCH_WORKERS = 8
+ASSET_FIELDS = ("Adj Close", "Close")
+VIX_FIELDS = ("Close", "Adj Close")
+
+
+def flatten_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Drops the ticker level yfinance adds to single-ticker downloads."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    return df
+
+
+def close_prices(raw: pd.DataFrame, fields: tuple[str, ...] = ASSET_FIELDS) -> pd.Series:
+    """First of `fields` present in a single-ticker download (flat or yfinance MultiIndex)."""
+    df = flatten_columns(raw)
+    for field in fields:
+        if field in df.columns:
+            return df[field]
+    if df.shape[1] == 0:
+        return pd.Series(index=df.index, dtype=float)
+    return df.iloc[:, 0]  # fallback
+
+
+def _in_range(df: pd.DataFrame, start, end) -> pd.DataFrame:
+    return df.loc[(df.index >= pd.Timestamp(start)) & (df.index < pd.Timestamp(end))]
+
+
+class YFinanceSource:
+    """Daily bars from Yahoo Finance (the default network source)."""
+
+    def __init__(self, timeout: float = 10.0):
+        self.timeout = timeout
+
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        return yf.download(ticker, start=start, end=end, progress=False, threads=False, timeout=self.timeout)
+
+
+class CsvSource:
+    """Daily bars from local <directory>/<ticker>.csv files (Date index + OHLC columns).
+
+    Drop-in replacement for YFinanceSource in tests or offline research;
+    latency (seconds) simulates a slow network per fetch, and a fetch slower
+    than timeout gives up after timeout seconds with TimeoutError, like a
+    network source would.
+    """
+
+    def __init__(self, directory: str | Path, latency: float = 0.0, timeout: float | None = 10.0):
+        self.directory = Path(directory)
+        self.latency = latency
+        self.timeout = timeout
+
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        if self.timeout is not None and self.latency > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"{ticker}: no response within {self.timeout}s")
+        if self.latency:
+            time.sleep(self.latency)
+        df = pd.read_csv(self.directory / f"{ticker}.csv", index_col=0, parse_dates=True)
+        return _in_range(df, start, end)
+
+
+class HttpCsvSource:
+    """Daily bars from <base_url>/<ticker>.csv over HTTP, e.g. a local `python -m http.server`."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def fetch(self, ticker: str, start, end) -> pd.DataFrame:
+        url = f"{self.base_url}/{urllib.parse.quote(ticker)}.csv"
+        with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+            df = pd.read_csv(io.BytesIO(resp.read()), index_col=0, parse_dates=True)
+        return _in_range(df, start, end)
+
+
+def fetch_with_retry(source, ticker: str, start, end, retries: int = 2, backoff: float = 0.5) -> pd.DataFrame:
+    """source.fetch with up to `retries` retries and exponential backoff on errors (timeouts included)."""
+    for attempt in range(retries + 1):
+        try:
+            return source.fetch(ticker, start, end)
+        except Exception as e:
+            if attempt == retries:
+                raise
+            print(f"Fetching {ticker} failed ({e}), retrying...")
+            time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_many(fetch, tickers: list[str], max_workers: int = MAX_FETCH_WORKERS) -> dict[str, pd.DataFrame]:
+    """Runs fetch(ticker) for every ticker on a bounded thread pool, so wall time
+    tracks the slowest fetch rather than the sum. Results are keyed by ticker."""
+    tickers = list(dict.fromkeys(tickers))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        futures = {t: pool.submit(fetch, t) for t in tickers}
+        return {t: f.result() for t, f in futures.items()}
+
+
+class PriceCache:
+    """On-disk cache of daily bars per ticker in front of a pluggable price source.
+
+    Each ticker keeps its bars (<ticker>.parquet) and the [start, end) range it
+    covers (<ticker>.json). A request loads the covered part from disk and only
+    fetches the missing edges; offline=True never calls the source.
+    """
+
+    def __init__(self, cache_dir: str | Path = "./data/prices", source=None, offline: bool = False,
+                 retries: int = 2):
+        self.cache_dir = Path(cache_dir)
+        self.source = source if source is not None else YFinanceSource()
+        self.offline = offline
+        self.retries = retries
+
+    def _paths(self, ticker: str) -> tuple[Path, Path]:
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return self.cache_dir / f"{name}.parquet", self.cache_dir / f"{name}.json"
+
+    def _load(self, ticker: str):
+        data_path, meta_path = self._paths(ticker)
+        if not (data_path.exists() and meta_path.exists()):
+            return None, None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        covered = (pd.Timestamp(meta["start"]), pd.Timestamp(meta["end"]))
+        return pd.read_parquet(data_path), covered
+
+    def _save(self, ticker: str, data: pd.DataFrame, covered):
+        data_path, meta_path = self._paths(ticker)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        data.to_parquet(data_path)
+        with open(meta_path, "w") as f:
+            json.dump({"start": str(covered[0].date()), "end": str(covered[1].date())}, f)
+
+    def get(self, ticker: str, start, end) -> pd.DataFrame:
+        """Daily bars for ticker in [start, end), fetching only what the cache lacks."""
+        start, end = pd.Timestamp(start), pd.Timestamp(end)
+        data, covered = self._load(ticker)
+
+        if not self.offline:
+            # today's bar may still be moving, so never mark it as covered
+            fetch_end = min(end, pd.Timestamp.today().normalize())
+            if covered is None:
+                gaps = [(start, end)]
+                new_cover = (start, max(start, fetch_end))
+            else:
+                lo, hi = covered
+                gaps = [(start, lo)] if start < lo else []
+                if end > hi:
+                    gaps.append((hi, end))
+                new_cover = (min(start, lo), max(hi, fetch_end))
+
+            if gaps:
+                parts = [data] if data is not None else []
+                for gap_start, gap_end in gaps:
+                    print(f"Fetching {ticker} {gap_start.date()} -> {gap_end.date()}...")
+                    raw = fetch_with_retry(self.source, ticker, gap_start, gap_end, self.retries)
+                    parts.append(flatten_columns(raw))
+                data = pd.concat([p for p in parts if not p.empty] or parts)
+                data = data[~data.index.duplicated(keep="last")].sort_index()
+                self._save(ticker, data, new_cover)
+
+        if data is None or data.empty:
+            raise ValueError(f"No cached prices for {ticker}" + (" (offline mode)" if self.offline else ""))
+        return data.loc[(data.index >= start) & (data.index < end)]
+
+    def get_many(self, tickers: list[str], start, end, max_workers: int = MAX_FETCH_WORKERS) -> dict[str, pd.DataFrame]:
+        """get() for several tickers concurrently (each ticker has its own cache files)."""
+        return fetch_many(lambda t: self.get(t, start, end), tickers, max_workers)
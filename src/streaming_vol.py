@@ -0,0 +1,130 @@
+from collections import deque
+
+import numpy as np
+
+
+class RollingVolEstimator:
+    """Sliding-window realized volatility, updated one bar at a time.
+
+    Keeps a sliding Welford state (count, mean, M2) per window over the last
+    max(windows) log returns, so each update costs O(len(windows)) no matter
+    how long the history is. Matches VolatilityAnalyzer.calculate_rolling_volatility.
+    """
+
+    def __init__(self, windows: list[int] = [20, 60, 120], ann_factor: float = np.sqrt(252)):
+        self.windows = sorted(set(windows))
+        self.ann_factor = ann_factor
+        self.last_price: float | None = None
+        self.returns: deque = deque(maxlen=max(self.windows))
+        self.state = {w: [0, 0.0, 0.0] for w in self.windows}  # count, mean, M2
+
+    def update(self, price: float) -> dict[str, float]:
+        """Feeds one close; returns {'Vol_<w>d': annualized vol} (NaN until a window is full)."""
+        price = float(price)
+        if self.last_price is not None:
+            self._push(np.log(price / self.last_price))
+        self.last_price = price
+        return self.current()
+
+    def _push(self, x: float):
+        for w in self.windows:
+            st = self.state[w]
+            n, mean, m2 = st
+            if n < w:
+                n += 1
+                delta = x - mean
+                mean += delta / n
+                m2 += delta * (x - mean)
+            else:
+                # x replaces the return that falls out of this window
+                old = self.returns[-w]
+                new_mean = mean + (x - old) / w
+                m2 += (x - old) * (x - new_mean + old - mean)
+                mean = new_mean
+            st[0], st[1], st[2] = n, mean, max(m2, 0.0)
+        self.returns.append(x)
+
+    def current(self) -> dict[str, float]:
+        out = {}
+        for w in self.windows:
+            n, _, m2 = self.state[w]
+            out[f'Vol_{w}d'] = np.sqrt(m2 / (w - 1)) * self.ann_factor if n == w and w > 1 else np.nan
+        return out
+
+    def snapshot(self) -> dict:
+        """JSON-serializable state; restore() resumes without replaying history."""
+        return {
+            "windows": self.windows,
+            "ann_factor": self.ann_factor,
+            "last_price": self.last_price,
+            "returns": list(self.returns),
+            "state": {str(w): list(st) for w, st in self.state.items()},
+        }
+
+    @classmethod
+    def restore(cls, snap: dict) -> "RollingVolEstimator":
+        est = cls(snap["windows"], snap["ann_factor"])
+        est.last_price = snap["last_price"]
+        est.returns.extend(snap["returns"])
+        est.state = {int(w): list(st) for w, st in snap["state"].items()}
+        return est
+
+
+class EwmaVolEstimator:
+    """RiskMetrics EWMA volatility, updated one bar at a time in O(1).
+
+    Matches VolatilityAnalyzer.calculate_ewma_volatility (pandas ewm, adjust=False).
+    """
+
+    def __init__(self, decay_factor: float = 0.94, ann_factor: float = np.sqrt(252)):
+        self.decay_factor = decay_factor
+        self.ann_factor = ann_factor
+        self.last_price: float | None = None
+        self.var: float | None = None
+
+    def update(self, price: float) -> dict[str, float]:
+        """Feeds one close; returns {'Vol_EWMA': annualized vol} (NaN before the first return)."""
+        price = float(price)
+        if self.last_price is not None:
+            r2 = np.log(price / self.last_price) ** 2
+            self.var = r2 if self.var is None else self.decay_factor * self.var + (1 - self.decay_factor) * r2
+        self.last_price = price
+        return self.current()
+
+    def current(self) -> dict[str, float]:
+        return {'Vol_EWMA': np.sqrt(self.var) * self.ann_factor if self.var is not None else np.nan}
+
+    def snapshot(self) -> dict:
+        return {"decay_factor": self.decay_factor, "ann_factor": self.ann_factor,
+                "last_price": self.last_price, "var": self.var}
+
+    @classmethod
+    def restore(cls, snap: dict) -> "EwmaVolEstimator":
+        est = cls(snap["decay_factor"], snap["ann_factor"])
+        est.last_price = snap["last_price"]
+        est.var = snap["var"]
+        return est
+
+
+class StreamingVolatility:
+    """Rolling windows + EWMA behind a single update(price) call."""
+
+    def __init__(self, windows: list[int] = [20, 60, 120], decay_factor: float = 0.94):
+        self.rolling = RollingVolEstimator(windows)
+        self.ewma = EwmaVolEstimator(decay_factor)
+
+    def update(self, price: float) -> dict[str, float]:
+        return {**self.rolling.update(price), **self.ewma.update(price)}
+
+    def current(self) -> dict[str, float]:
+        return {**self.rolling.current(), **self.ewma.current()}
+
+    def snapshot(self) -> dict:
+        return {"rolling": self.rolling.snapshot(), "ewma": self.ewma.snapshot()}
+
+    @classmethod
+    def restore(cls, snap: dict) -> "StreamingVolatility":
+        est = cls.__new__(cls)
+        est.rolling = RollingVolEstimator.restore(snap["rolling"])
+        est.ewma = EwmaVolEstimator.restore(snap["ewma"])
+        return est
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def compensated_cumsum(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Prefix sums along axis 0 as an unevaluated pair hi + lo, with a leading zero row.
+
+    hi is the plain running sum; lo accumulates the exact rounding error of
+    every step (TwoSum), which is what Kahan summation carries along, but
+    computed with whole-array operations.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    zero = np.zeros((1,) + x.shape[1:])
+    hi = np.concatenate([zero, np.cumsum(x, axis=0)])
+    prev = hi[:-1]
+    b_virtual = hi[1:] - prev
+    err = (prev - (hi[1:] - b_virtual)) + (x - b_virtual)
+    lo = np.concatenate([zero, np.cumsum(err, axis=0)])
+    return hi, lo
+
+
+def window_sums(hi: np.ndarray, lo: np.ndarray, w: int) -> np.ndarray:
+    """Sum over the (up to) w rows ending at each row, from compensated prefix sums."""
+    end = np.arange(1, len(hi))
+    start = np.maximum(end - w, 0)
+    return (hi[end] - hi[start]) + (lo[end] - lo[start])
+
+
+def rolling_std(x: np.ndarray, windows: list[int], min_periods: int | None = None, ddof: int = 1) -> dict[int, np.ndarray]:
+    """Rolling standard deviation for many windows from one set of prefix sums.
+
+    Same result as pd.Series(x).rolling(w, min_periods).std() for each w. x may be
+    1-D or (n, k) (one column per series); NaNs are masked out of each window and a
+    window needs min_periods valid values (default: w). The data is centered first
+    so the sum-of-squares formula does not cancel.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = x.shape[0]
+    valid = ~np.isnan(x)
+    shift = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(valid.sum(axis=0), 1)
+    xc = np.where(valid, x - shift, 0.0)
+
+    s1_hi, s1_lo = compensated_cumsum(xc)
+    s2_hi, s2_lo = compensated_cumsum(xc * xc)
+    cnt = np.concatenate([np.zeros((1,) + x.shape[1:], dtype=np.int64), np.cumsum(valid, axis=0)])
+
+    out = {}
+    for w in windows:
+        end = np.arange(1, n + 1)
+        m = cnt[end] - cnt[np.maximum(end - w, 0)]
+        s1 = window_sums(s1_hi, s1_lo, w)
+        s2 = window_sums(s2_hi, s2_lo, w)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = np.maximum((s2 - s1 * s1 / m) / (m - ddof), 0.0)
+        ok = (m >= (min_periods or w)) & (m > ddof)
+        out[w] = np.where(ok, np.sqrt(var), np.nan)
+    return out
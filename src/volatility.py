@@ -1,52 +1,37 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 
+from src.garch import PARAM_COLUMNS, garch_backtest, garch_vol, report_unconverged
+from src.price_cache import (ASSET_FIELDS, VIX_FIELDS, PriceCache, YFinanceSource, close_prices, fetch_many,
+                             fetch_with_retry)
+from src.vol_kernels import compensated_cumsum, rolling_std
+
 
 class VolatilityAnalyzer:
-    def __init__(self, ticker: str, start_date: str, end_date: str):
+    def __init__(self, ticker: str, start_date: str, end_date: str, price_cache: PriceCache | None = None):
         self.ticker = ticker
         self.start_date = start_date
         self.end_date = end_date
+        self.price_cache = price_cache  # None = download straight from yfinance every time
         self.data: pd.DataFrame | None = None
 
+    def _download_many(self, tickers: list[str]) -> dict[str, pd.DataFrame]:
+        return _download_many(tickers, self.start_date, self.end_date, self.price_cache)
+
     def fetch_data(self):
         """Fetches SPY price data AND VIX 'Fear Index' data."""
-        print(f"Fetching data for {self.ticker}...")
-        
-        # 1. Download Asset Data (e.g., SPY)
-        self.data = yf.download(self.ticker, start=self.start_date, end=self.end_date, progress=False)
-        
-        # Handle MultiIndex cleanup (Standardizing formatting)
-        if isinstance(self.data.columns, pd.MultiIndex):
-            if 'Adj Close' in self.data.columns.get_level_values(0):
-                self.data = self.data.xs('Adj Close', level=0, axis=1)
-            else:
-                self.data = self.data.xs('Close', level=0, axis=1)
-        else:
-            col = 'Adj Close' if 'Adj Close' in self.data.columns else 'Close'
-            self.data = self.data[[col]].copy()
-            self.data.rename(columns={col: 'Price'}, inplace=True)
-            
-        if 'Price' not in self.data.columns: self.data.columns = ['Price']
+        print(f"Fetching data for {self.ticker} and VIX (Implied Volatility)...")
 
-        # 2. Download VIX Data (The "Fear Gauge")
-        print("Fetching VIX (Implied Volatility) data...")
-        vix_data = yf.download("^VIX", start=self.start_date, end=self.end_date, progress=False)
-        
-        # Clean VIX data similar to Asset data
-        if isinstance(vix_data.columns, pd.MultiIndex):
-            if 'Close' in vix_data.columns.get_level_values(0):
-                vix_vals = vix_data.xs('Close', level=0, axis=1)
-            else:
-                vix_vals = vix_data.iloc[:, 0] # Fallback
-        else:
-            vix_vals = vix_data['Close'] if 'Close' in vix_data.columns else vix_data['Adj Close']
-            
-        # Merge VIX into main dataframe (Align dates)
+        # 1. Download Asset Data (e.g., SPY) and the VIX "Fear Gauge" concurrently
+        raw = self._download_many([self.ticker, "^VIX"])
+
+        # Standardize formatting (same column rules for both sources)
+        self.data = close_prices(raw[self.ticker], ASSET_FIELDS).to_frame('Price')
+
+        # 2. Merge VIX into main dataframe (Align dates)
         # Note: VIX is 20.0, we want 0.20 to match our calc, so divide by 100
-        self.data['VIX_Close'] = vix_vals / 100.0
+        self.data['VIX_Close'] = close_prices(raw["^VIX"], VIX_FIELDS) / 100.0
 
         # 3. Calculate Returns
         self.data['Log_Ret'] = np.log(self.data['Price'] / self.data['Price'].shift(1))
@@ -55,23 +40,55 @@ class VolatilityAnalyzer:
         return self.data
 
     def calculate_rolling_volatility(self, windows: list[int] = [20, 60, 120]) -> pd.DataFrame:
-        """Calculates annualized rolling volatility for standard windows."""
+        """Calculates annualized rolling volatility for standard windows.
+
+        All windows come from one set of prefix sums (src/vol_kernels.py), so a
+        5-250 day term structure costs about as much as a single window.
+        """
         if self.data is None:
             raise ValueError("No data loaded. Call fetch_data() first.")
         ann_factor = np.sqrt(252)
-        for w in windows:
-            col_name = f'Vol_{w}d'
-            self.data[col_name] = self.data['Log_Ret'].rolling(window=w).std() * ann_factor
+        vols = rolling_std(self.data['Log_Ret'].to_numpy(), windows)
+        new_cols = pd.DataFrame({f'Vol_{w}d': vols[w] * ann_factor for w in windows}, index=self.data.index)
+        self.data = pd.concat([self.data.drop(columns=new_cols.columns, errors='ignore'), new_cols], axis=1)
         return self.data
 
-    def calculate_ewma_volatility(self, decay_factor: float = 0.94) -> pd.DataFrame:
-        """Calculates EWMA volatility (RiskMetrics style)."""
+    def calculate_ewma_volatility(self, decay_factor: float = 0.94, keep_intermediate: bool = True) -> pd.DataFrame:
+        """Calculates EWMA volatility (RiskMetrics style).
+
+        keep_intermediate=False skips the Squared_Ret / EWMA_Var columns and only adds Vol_EWMA.
+        """
         if self.data is None:
             raise ValueError("No data loaded. Call fetch_data() first.")
         ann_factor = np.sqrt(252)
-        self.data['Squared_Ret'] = self.data['Log_Ret'] ** 2
-        self.data['EWMA_Var'] = self.data['Squared_Ret'].ewm(alpha=(1 - decay_factor), adjust=False).mean()
-        self.data['Vol_EWMA'] = np.sqrt(self.data['EWMA_Var']) * ann_factor
+        squared_ret = self.data['Log_Ret'] ** 2
+        ewma_var = squared_ret.ewm(alpha=(1 - decay_factor), adjust=False).mean()
+        if keep_intermediate:
+            self.data['Squared_Ret'] = squared_ret
+            self.data['EWMA_Var'] = ewma_var
+        self.data['Vol_EWMA'] = np.sqrt(ewma_var) * ann_factor
+        return self.data
+
+    def calculate_garch_volatility(self, window: int = 500, horizon: int = 1, workers: int | None = 1,
+                                   cache_dir: str | None = None, keep_params: bool = False) -> pd.DataFrame:
+        """Rolling GARCH(1,1) volatility (src/garch.py), refit on every trading day.
+
+        Vol_GARCH on day t is the annualized forecast over the next `horizon` days
+        from the fit on the `window` returns up to t (NaN for the first window-1
+        days and where the fit did not converge). cache_dir keeps the fits so
+        later runs only refit new days; keep_params also adds the GARCH_omega /
+        _alpha / _beta / _converged columns.
+        """
+        if self.data is None:
+            raise ValueError("No data loaded. Call fetch_data() first.")
+        params = garch_backtest({self.ticker: self.data['Log_Ret']}, window, workers=workers,
+                                cache_dir=cache_dir)[self.ticker]
+        report_unconverged({self.ticker: params})
+        self.data['Vol_GARCH'] = garch_vol(params, horizon).reindex(self.data.index)
+        if keep_params:
+            for col in PARAM_COLUMNS[:3]:
+                self.data[f'GARCH_{col}'] = params[col].astype(np.float64).reindex(self.data.index)
+            self.data['GARCH_converged'] = params['converged'].reindex(self.data.index)
         return self.data
 
     def analyze_event_impact(self, event_date: str, lookback_window: int = 10):
@@ -79,33 +96,77 @@ class VolatilityAnalyzer:
         if self.data is None:
             raise ValueError("No data loaded. Call fetch_data() first.")
 
-        target = pd.to_datetime(event_date)
-        if getattr(self.data.index, "tz", None) is not None and self.data.index.tz is not None:
-            target = target.tz_localize(self.data.index.tz)
-
         try:
-            idx_loc = self.data.index.get_indexer([target], method='nearest')[0]
-            event_idx = self.data.index[idx_loc]
-
-            start_loc = max(0, idx_loc - lookback_window)
-            end_loc = min(len(self.data), idx_loc + lookback_window)
-
-            pre_event = self.data.iloc[start_loc:idx_loc]['Log_Ret']
-            post_event = self.data.iloc[idx_loc:end_loc]['Log_Ret']
-
-            pre_vol = pre_event.std() * np.sqrt(252)
-            post_vol = post_event.std() * np.sqrt(252)
-
+            row = self.analyze_events([event_date], lookback_windows=[lookback_window]).iloc[0]
+            w = lookback_window
             return {
-                "Event Date": getattr(event_idx, "date", lambda: event_idx)(),
-                f"Pre ({lookback_window}d)": round(pre_vol * 100, 2),
-                f"Post ({lookback_window}d)": round(post_vol * 100, 2),
-                "Change": round((post_vol - pre_vol) * 100, 2)
+                "Event Date": row["Event Date"].date(),
+                f"Pre ({w}d)": round(row[f"Pre ({w}d)"], 2),
+                f"Post ({w}d)": round(row[f"Post ({w}d)"], 2),
+                "Change": round(row[f"Change ({w}d)"], 2)
             }
         except Exception as e:
             return f"Error analyzing date {event_date}: {e}"
 
-    def plot_comparison(self):
+    def analyze_events(self, event_dates, lookback_windows: list[int] = [10]) -> pd.DataFrame:
+        """Pre/post realized volatility (annualized, in %) around many event dates at once.
+
+        Each event is snapped to the nearest trading day with one searchsorted;
+        'pre' is the w returns before it and 'post' the w returns from it on,
+        both read off cumulative sums. One row per event. Windows cut short by
+        the start/end of the data are flagged in 'Edge (<w>d)', and any side
+        with fewer than 2 returns is NaN.
+        """
+        if self.data is None:
+            raise ValueError("No data loaded. Call fetch_data() first.")
+        index = self.data.index
+        n = len(index)
+        if n == 0:
+            raise ValueError("No data loaded. Call fetch_data() first.")
+
+        targets = pd.DatetimeIndex(pd.to_datetime(event_dates))
+        if getattr(index, "tz", None) is not None and targets.tz is None:
+            targets = targets.tz_localize(index.tz)
+
+        # nearest trading day; ties go to the later day, like get_indexer(method='nearest')
+        left = np.clip(index.searchsorted(targets, side='right') - 1, 0, n - 1)
+        right = np.clip(index.searchsorted(targets, side='left'), 0, n - 1)
+        left_dist = np.abs((targets - index[left]).to_numpy())
+        right_dist = np.abs((index[right] - targets).to_numpy())
+        loc = np.where(left_dist < right_dist, left, right)
+
+        ret = self.data['Log_Ret'].to_numpy(dtype=np.float64)
+        xc = ret - ret.mean()
+        s1_hi, s1_lo = compensated_cumsum(xc)
+        s2_hi, s2_lo = compensated_cumsum(xc * xc)
+
+        def window_vol(start, stop):
+            m = stop - start
+            s1 = (s1_hi[stop] - s1_hi[start]) + (s1_lo[stop] - s1_lo[start])
+            s2 = (s2_hi[stop] - s2_hi[start]) + (s2_lo[stop] - s2_lo[start])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                var = np.maximum((s2 - s1 * s1 / m) / (m - 1), 0.0)
+            return np.where(m >= 2, np.sqrt(var) * np.sqrt(252) * 100, np.nan)
+
+        out = pd.DataFrame({
+            "Requested Date": targets,
+            "Event Date": index[loc],
+            "Days Off": (index[loc] - targets).days,
+            "Out of Range": (targets < index[0]) | (targets > index[-1]),
+        })
+        for w in lookback_windows:
+            pre_start = np.maximum(loc - w, 0)
+            post_stop = np.minimum(loc + w, n)
+            pre = window_vol(pre_start, loc)
+            post = window_vol(loc, post_stop)
+            out[f"Pre ({w}d)"] = pre
+            out[f"Post ({w}d)"] = post
+            out[f"Change ({w}d)"] = post - pre
+            out[f"Edge ({w}d)"] = (loc - pre_start < w) | (post_stop - loc < w)
+        return out
+
+    def plot_comparison(self, iv_term: pd.DataFrame | None = None):
+        """iv_term: optional chain ATM implied vols by date (results/implied_vol.py, ATM_IV_<d>d columns)."""
         if self.data is None or self.data.empty: return
 
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), sharex=True, gridspec_kw={'height_ratios': [2, 1]})
@@ -116,11 +177,18 @@ class VolatilityAnalyzer:
             ax1.plot(self.data.index, self.data['Vol_120d'], label='120d Realized (Trend)', color='black', linestyle='--', alpha=0.7)
         if 'Vol_EWMA' in self.data.columns:
             ax1.plot(self.data.index, self.data['Vol_EWMA'], label='EWMA Realized (Fast)', color='red', linewidth=1.5)
+        if 'Vol_GARCH' in self.data.columns:
+            ax1.plot(self.data.index, self.data['Vol_GARCH'], label='GARCH(1,1) Forecast', color='darkcyan', linewidth=1.2)
             
         # 2. Implied Volatility (What market feared - The VIX)
         if 'VIX_Close' in self.data.columns:
             ax1.plot(self.data.index, self.data['VIX_Close'], label='VIX (Market Fear)', color='green', alpha=0.5, linewidth=1)
 
+        # 3. Chain ATM implied vol term structure (from the option chain itself)
+        if iv_term is not None and not iv_term.empty:
+            for col, color in zip(iv_term.columns, ['blue', 'purple', 'orange', 'brown']):
+                ax1.plot(iv_term.index, iv_term[col], label=f'{col[7:]} ATM IV (chain)', color=color, alpha=0.7, linewidth=1)
+
         ax1.set_title(f'Realized Volatility vs. Market Fear (VIX): {self.ticker}')
         ax1.set_ylabel('Annualized Volatility')
         ax1.legend(loc='upper left')
@@ -144,4 +212,91 @@ class VolatilityAnalyzer:
             ax2.grid(True, alpha=0.3)
 
         plt.tight_layout()
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+class PanelVolatilityAnalyzer:
+    """Many tickers at once: log returns live in one dates x tickers matrix and
+    every estimator runs on the whole matrix instead of one object per ticker."""
+
+    def __init__(self, tickers: list[str], start_date: str, end_date: str, price_cache: PriceCache | None = None):
+        self.tickers = list(tickers)
+        self.start_date = start_date
+        self.end_date = end_date
+        self.price_cache = price_cache
+        self.prices: pd.DataFrame | None = None
+        self.returns: pd.DataFrame | None = None
+        self.vols: dict[str, pd.DataFrame] = {}
+
+    def fetch_data(self) -> pd.DataFrame:
+        """Fetches close prices for every ticker and builds the log-return matrix."""
+        print(f"Fetching data for {len(self.tickers)} tickers...")
+        raw = _download_many(self.tickers, self.start_date, self.end_date, self.price_cache)
+        prices = pd.DataFrame({t: close_prices(raw[t]) for t in self.tickers}).sort_index()
+
+        # a missing bar is masked (NaN); the next return is taken from the last
+        # available close, as in the single-ticker analyzer
+        rets = np.log(prices / prices.ffill().shift(1)).where(prices.notna())
+        self.prices = prices
+        self.returns = rets.dropna(how='all')
+        self.vols = {}
+        return self.returns
+
+    def calculate_rolling_volatility(self, windows: list[int] = [20, 60, 120], min_periods: int | None = None) -> dict[str, pd.DataFrame]:
+        """Annualized rolling volatility for all tickers at once.
+
+        Missing bars inside a window are skipped; a window needs min_periods
+        valid returns (default: all w of them).
+        """
+        if self.returns is None:
+            raise ValueError("No data loaded. Call fetch_data() first.")
+        ann_factor = np.sqrt(252)
+        vols = rolling_std(self.returns.to_numpy(), windows, min_periods=min_periods)
+        for w in windows:
+            self.vols[f'Vol_{w}d'] = pd.DataFrame(vols[w] * ann_factor, index=self.returns.index, columns=self.returns.columns)
+        return self.vols
+
+    def calculate_ewma_volatility(self, decay_factor: float = 0.94) -> pd.DataFrame:
+        """EWMA volatility (RiskMetrics style) for all tickers; missing bars are skipped."""
+        if self.returns is None:
+            raise ValueError("No data loaded. Call fetch_data() first.")
+        ann_factor = np.sqrt(252)
+        ewma_var = (self.returns ** 2).ewm(alpha=(1 - decay_factor), adjust=False, ignore_na=True).mean()
+        self.vols['Vol_EWMA'] = (np.sqrt(ewma_var) * ann_factor).where(self.returns.notna())
+        return self.vols['Vol_EWMA']
+
+    def calculate_garch_volatility(self, window: int = 500, horizon: int = 1, workers: int | None = None,
+                                   cache_dir: str | None = None) -> pd.DataFrame:
+        """Rolling GARCH(1,1) volatility per ticker on its own valid returns (NaN where the
+        fit did not converge); tickers and blocks of window ends are fitted in
+        parallel (workers=None: all cores)."""
+        if self.returns is None:
+            raise ValueError("No data loaded. Call fetch_data() first.")
+        params = garch_backtest({t: self.returns[t] for t in self.returns.columns}, window,
+                                workers=workers, cache_dir=cache_dir)
+        report_unconverged(params)
+        vols = pd.DataFrame({t: garch_vol(params[t], horizon) for t in self.returns.columns},
+                            index=self.returns.index, columns=self.returns.columns)
+        self.vols['Vol_GARCH'] = vols.where(self.returns.notna())
+        return self.vols['Vol_GARCH']
+
+    def to_frame(self, layout: str = 'wide') -> pd.DataFrame:
+        """Returns and vols as 'wide' ((measure, ticker) columns) or 'tidy' (one row per date and ticker)."""
+        if self.returns is None:
+            raise ValueError("No data loaded. Call fetch_data() first.")
+        frames = {'Log_Ret': self.returns, **self.vols}
+        if layout == 'wide':
+            return pd.concat(frames, axis=1)
+        if layout == 'tidy':
+            index = pd.MultiIndex.from_product([self.returns.index, self.returns.columns], names=['Date', 'Ticker'])
+            tidy = pd.DataFrame({k: v.to_numpy().ravel() for k, v in frames.items()}, index=index)
+            return tidy.dropna(subset=['Log_Ret']).reset_index()
+        raise ValueError(f"Unknown layout: {layout!r} (use 'wide' or 'tidy')")
+
+
+def _download_many(tickers: list[str], start_date: str, end_date: str,
+                   price_cache: PriceCache | None) -> dict[str, pd.DataFrame]:
+    """Daily bars per ticker, fetched concurrently (through the cache if there is one)."""
+    if price_cache is not None:
+        return price_cache.get_many(tickers, start_date, end_date)
+    source = YFinanceSource()
+    return fetch_many(lambda t: fetch_with_retry(source, t, start_date, end_date), tickers)
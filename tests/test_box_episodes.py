@@ -0,0 +1,76 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "results"), os.path.join(ROOT, "benchmarks")]
+
+import pandas as pd
+import pytest
+
+import arbitrage_opp_update as scan
+from daily_summary import summary_path
+from synthetic import synthetic_chain
+
+DAYS = 12
+NO_LEGS_DAY = 5  # quotes on this day are calls only, so no strike pairs into a leg
+
+
+def _chain() -> pd.DataFrame:
+    raw = synthetic_chain(DAYS, expirations=3, strikes=30, noise=0.3, seed=1)
+    days = sorted(raw["date"].unique())
+    return raw[~((raw["date"] == days[NO_LEGS_DAY]) & (raw["call_put"] == "Put"))]
+
+
+def _configure(monkeypatch, tmp_path, name: str) -> dict:
+    """Runs the scan inside tmp_path / name, with its default relative paths."""
+    (tmp_path / name / "options").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path / name)
+    monkeypatch.setattr(scan, "USE_CACHE", False)
+    monkeypatch.setattr(scan, "MIN_PROFIT", 0.0)
+    monkeypatch.setattr(scan, "EPISODES", ("allpairs",))
+    return {"allpairs": scan.OUT_ALL}
+
+
+@pytest.mark.parametrize("low_memory", [False, True])
+def test_incremental_episodes_match_full_run(monkeypatch, tmp_path, low_memory):
+    raw = _chain()
+    days = sorted(raw["date"].unique())
+
+    outputs = _configure(monkeypatch, tmp_path, "full")
+    raw.to_csv(scan.PATH, index=False)
+    scan.run(outputs, incremental=False, low_memory=low_memory)
+    full = pd.read_parquet(summary_path(outputs["allpairs"], "episodes"))
+
+    outputs = _configure(monkeypatch, tmp_path, "incremental")
+    for last in (NO_LEGS_DAY - 1, NO_LEGS_DAY, DAYS - 1):
+        raw[raw["date"] <= days[last]].to_csv(scan.PATH, index=False)
+        scan.run(outputs, incremental=True, low_memory=low_memory)
+    incremental = pd.read_parquet(summary_path(outputs["allpairs"], "episodes"))
+
+    assert len(full) > 0 and not full["open"].all()
+    # the day without legs is a scanned day: no episode runs across it
+    gap_day = pd.Timestamp(days[NO_LEGS_DAY])
+    assert not ((full["first_seen"] < gap_day) & (full["last_seen"] > gap_day)).any()
+    pd.testing.assert_frame_equal(full, incremental)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+@pytest.mark.parametrize("low_memory", [False, True])
+def test_rescan_without_results_empties_output(monkeypatch, tmp_path, incremental, low_memory):
+    raw = _chain()
+    days = sorted(raw["date"].unique())
+    outputs = _configure(monkeypatch, tmp_path, "rescan")
+    raw[raw["date"] <= days[-2]].to_csv(scan.PATH, index=False)
+    scan.run(outputs, incremental=incremental, low_memory=low_memory)
+    assert len(pd.read_csv(outputs["allpairs"])) > 0
+
+    # a config change forces a rebuild that finds nothing; the old rows must not survive it
+    monkeypatch.setattr(scan, "MIN_PROFIT", 1e9)
+    scan.run(outputs, incremental=incremental, low_memory=low_memory)
+    assert pd.read_csv(outputs["allpairs"]).empty
+
+    # nor reappear under the next incremental run's appended day
+    raw.to_csv(scan.PATH, index=False)
+    scan.run(outputs, incremental=incremental, low_memory=low_memory)
+    out = pd.read_csv(outputs["allpairs"])
+    assert out.empty and list(out.columns) == scan.BOX_COLUMNS
@@ -0,0 +1,47 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT]
+
+import numpy as np
+import pandas as pd
+
+from src.garch import BLOCK, garch_backtest, garch_vol
+
+WINDOW = 250
+DAYS = WINDOW + BLOCK + 100  # window ends span two blocks
+
+
+def _returns() -> dict[str, pd.Series]:
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range("2015-01-01", periods=DAYS)
+    # heavy tails: the case where warm starts stall and cold restarts kick in
+    return {f"T{i}": pd.Series(rng.standard_t(5, DAYS) * 0.01, index) for i in range(2)}
+
+
+def test_fits_do_not_depend_on_workers():
+    returns = _returns()
+    serial = garch_backtest(returns, WINDOW, workers=1)
+    parallel = garch_backtest(returns, WINDOW, workers=2)
+    for ticker, df in serial.items():
+        assert len(df) == DAYS - WINDOW + 1
+        assert df["converged"].mean() > 0.95
+        pd.testing.assert_frame_equal(df, parallel[ticker])
+
+
+def test_cached_rerun_matches_fresh_fit(tmp_path):
+    returns = _returns()
+    garch_backtest({t: s.iloc[:WINDOW + 50] for t, s in returns.items()}, WINDOW, cache_dir=tmp_path)
+    cached = garch_backtest(returns, WINDOW, cache_dir=tmp_path)
+    fresh = garch_backtest(returns, WINDOW)
+    for ticker, df in fresh.items():
+        pd.testing.assert_frame_equal(df, cached[ticker])
+
+
+def test_unconverged_windows_have_no_vol():
+    params = garch_backtest({"T0": _returns()["T0"].iloc[:WINDOW + 20]}, WINDOW)["T0"]
+    params.loc[params.index[::3], "converged"] = False
+    vol = garch_vol(params, horizon=5)
+    assert vol[~params["converged"]].isna().all()
+    assert vol[params["converged"]].notna().all()
@@ -0,0 +1,28 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "results")]
+
+import numpy as np
+
+from implied_vol import black_price, implied_vol
+
+F, T, DISC = 100.0, 0.25, 0.99
+K = np.array([80.0, 95.0, 100.0, 105.0, 120.0])
+SIGMA = np.array([0.35, 0.25, 0.2, 0.18, 0.3])
+
+
+def test_scalar_forward_expiry_and_discount():
+    is_call = K >= F
+    price, _ = black_price(F, K, T, SIGMA, DISC, is_call)
+    np.testing.assert_allclose(implied_vol(price, F, K, T, DISC, is_call), SIGMA, rtol=1e-8)
+
+
+def test_all_scalar_inputs():
+    price, _ = black_price(F, 105.0, T, 0.2, DISC, True)
+    vol = implied_vol(price, F, 105.0, T, DISC, True)
+    assert vol.shape == ()
+    assert abs(vol - 0.2) < 1e-8
+    # no solution: the price is below intrinsic
+    assert np.isnan(implied_vol(1.0, F, 80.0, T, DISC, True))
@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import pytest
+
+from src.price_cache import CsvSource, PriceCache, fetch_many, fetch_with_retry
+from synthetic import synthetic_prices, write_prices
+
+TICKERS = ["SPY", "QQQ", "IWM", "TLT", "GLD", "XLE", "XLF", "^VIX"]
+LATENCY = 0.3
+START, END = "2010-01-04", "2011-01-01"
+
+
+@pytest.fixture
+def px_dir(tmp_path):
+    write_prices(synthetic_prices(TICKERS, 260, start=START), str(tmp_path / "px"))
+    return tmp_path / "px"
+
+
+def test_fetch_many_tracks_slowest_fetch(px_dir):
+    source = CsvSource(px_dir, latency=LATENCY)
+    t0 = time.perf_counter()
+    out = fetch_many(lambda t: fetch_with_retry(source, t, START, END), TICKERS)
+    wall = time.perf_counter() - t0
+    assert list(out) == TICKERS and all(len(df) for df in out.values())
+    # one latency, not len(TICKERS) of them
+    assert wall < 2 * LATENCY < len(TICKERS) * LATENCY
+
+
+def test_price_cache_get_many_is_concurrent(px_dir, tmp_path):
+    cache = PriceCache(tmp_path / "cache", source=CsvSource(px_dir, latency=LATENCY))
+    t0 = time.perf_counter()
+    out = cache.get_many(TICKERS, START, END)
+    assert time.perf_counter() - t0 < 2 * LATENCY
+    assert all(len(df) for df in out.values())
+
+
+def test_timeout_is_retried_then_raised(px_dir):
+    source = CsvSource(px_dir, latency=10.0, timeout=0.05)
+    t0 = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        fetch_with_retry(source, "SPY", START, END, retries=2, backoff=0.0)
+    # three attempts, each cut off at the timeout instead of waiting out the latency
+    assert 3 * 0.05 <= time.perf_counter() - t0 < 1.0